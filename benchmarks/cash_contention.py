@@ -0,0 +1,53 @@
+"""
+Lost updates under concurrency: read-compare-upsert versus adjust_cash_balance.
+
+Several threads each deposit 1.00 many times into the same unit on a seeded
+local SQLite database. The old pattern (read balance, add, upsert) loses
+deposits when reads interleave; the atomic function does not:
+    python -m benchmarks.cash_contention [--threads 8] [--deposits 200]
+"""
+import time
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from data.repository import Query, Repository
+from benchmarks.seed import seeded_sqlite
+
+UNIT = "Unit A"
+
+def balance(repository: Repository) -> float:
+    return repository.fetch(Query("cash_balances", "balance").eq("business_unit", UNIT))[0]["balance"]
+
+def read_modify_write(repository: Repository, deposits: int) -> None:
+    for _ in range(deposits):
+        current = balance(repository)
+        time.sleep(0)  # let other threads interleave, as network latency would
+        repository.upsert("cash_balances", {"business_unit": UNIT, "balance": current + 1.0})
+
+def atomic(repository: Repository, deposits: int) -> None:
+    for _ in range(deposits):
+        repository.rpc("adjust_cash_balance", {
+            "p_business_unit": UNIT, "p_amount": 1.0, "p_action": "add", "p_description": "bench"
+        })
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8, help="concurrent depositors")
+    parser.add_argument("--deposits", type=int, default=200, help="deposits per thread")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    expected = args.threads * args.deposits
+    for name, deposit in (("read-modify-write", read_modify_write), ("adjust_cash_balance", atomic)):
+        repository = seeded_sqlite(inventory=10, expenses=10)
+        start = balance(repository)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            list(pool.map(lambda _: deposit(repository, args.deposits), range(args.threads)))
+        elapsed = (time.perf_counter() - started) * 1000
+        applied = balance(repository) - start
+        print(f"{name:<22}{applied:>8.0f} of {expected} deposits applied  {elapsed:>8.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Memory and groupby time: raw fetched frames versus schema-coerced frames.
+
+Reads the inventory table of a seeded local SQLite database, then compares
+the frame as built from row dicts (object strings) with the same frame
+after data.schema.coerce (categoricals, datetime64):
+    python -m benchmarks.frame_dtypes [--rows 200000] [--repeat 20]
+"""
+import time
+import argparse
+import logging
+
+import pandas as pd
+
+from data.repository import Query
+from data.projections import InventoryRow, columns
+from data.schema import coerce
+from benchmarks.seed import seeded_sqlite
+
+def monthly_totals(frame: pd.DataFrame) -> pd.DataFrame:
+    months = pd.to_datetime(frame['date']).dt.to_period('M')
+    return frame.groupby(['business_unit', 'transaction_type', months], observed=True)['total_amount'].sum()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="inventory rows to seed")
+    parser.add_argument("--repeat", type=int, default=20, help="groupby repetitions")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    repository = seeded_sqlite(inventory=args.rows, expenses=10)
+    raw = pd.DataFrame(repository.fetch(Query("inventory", columns(InventoryRow))))
+    started = time.perf_counter()
+    typed = coerce(raw, "inventory")
+    print(f"coerce {len(raw)} rows  {(time.perf_counter() - started) * 1000:>8.0f} ms")
+
+    for name, frame in (("raw", raw), ("coerced", typed)):
+        memory = frame.memory_usage(deep=True).sum() / 2 ** 20
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            monthly_totals(frame)
+        elapsed = (time.perf_counter() - started) * 1000 / args.repeat
+        print(f"{name:<10}{memory:>8.1f} MB  groupby {elapsed:>8.1f} ms")
+
+if __name__ == "__main__":
+    main()
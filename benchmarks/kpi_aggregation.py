@@ -0,0 +1,82 @@
+"""
+Dashboard KPI cost: client-side pandas sums versus the unit_kpis aggregate
+versus the trigger-maintained unit_stock index.
+
+For growing transaction counts, times the old approach (download inventory and
+expenses, filter and sum in pandas) against one unit_kpis call that returns a
+row per business unit, and the stock totals alone against a unit_stock read,
+on a seeded local SQLite database:
+    python -m benchmarks.kpi_aggregation [--sizes 1000 10000 50000] [--repeat 5]
+"""
+import time
+import argparse
+import logging
+from typing import Callable, Dict
+
+import pandas as pd
+
+from data.repository import Query, Repository
+from benchmarks.seed import seeded_sqlite
+
+def client_side(repository: Repository) -> Dict[str, float]:
+    """Totals as the dashboard used to compute them"""
+    inventory = pd.DataFrame(repository.fetch(Query("inventory", "transaction_type, quantity_kg, total_amount")))
+    expenses = pd.DataFrame(repository.fetch(Query("expenses", "category, amount")))
+    purchases = inventory[inventory['transaction_type'] == 'Purchase']
+    sales = inventory[inventory['transaction_type'] == 'Sale']
+    operating = expenses[~expenses['category'].isin(['Partner Withdrawal', 'Partner Contribution'])]
+    return {
+        "stock_kg": purchases['quantity_kg'].sum() - sales['quantity_kg'].sum(),
+        "purchase_cost": purchases['total_amount'].sum(),
+        "sales_revenue": sales['total_amount'].sum(),
+        "operating_expenses": operating['amount'].sum(),
+    }
+
+def server_side(repository: Repository) -> Dict[str, float]:
+    """Totals from the aggregate function"""
+    kpis = pd.DataFrame(repository.rpc("unit_kpis"))
+    return {
+        "stock_kg": kpis['purchased_kg'].sum() - kpis['sold_kg'].sum(),
+        "purchase_cost": kpis['purchase_cost'].sum(),
+        "sales_revenue": kpis['sales_revenue'].sum(),
+        "operating_expenses": kpis['operating_expenses'].sum(),
+    }
+
+def stock_index(repository: Repository) -> Dict[str, float]:
+    """Stock totals from the unit_stock index (no expenses)"""
+    stock = pd.DataFrame(repository.fetch(Query("unit_stock")))
+    return {
+        "stock_kg": stock['purchased_kg'].sum() - stock['sold_kg'].sum(),
+        "purchase_cost": stock['purchase_cost'].sum(),
+        "sales_revenue": stock['sales_revenue'].sum(),
+    }
+
+def best_ms(operation: Callable[[], Dict[str, float]], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="inventory rows to seed")
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions (best is reported)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    print(f"{'rows':>8}{'pandas ms':>12}{'unit_kpis ms':>14}{'unit_stock ms':>15}{'rows returned':>15}")
+    for size in args.sizes:
+        repository = seeded_sqlite(inventory=size, expenses=size // 5)
+        expected = client_side(repository)
+        for actual in (server_side(repository), stock_index(repository)):
+            for key, value in actual.items():
+                assert abs(expected[key] - value) < 1e-3 * max(1.0, abs(value)), f"{key} mismatch"
+        returned = len(repository.rpc("unit_kpis"))
+        print(f"{size:>8}{best_ms(lambda: client_side(repository), args.repeat):>12.2f}"
+              f"{best_ms(lambda: server_side(repository), args.repeat):>14.2f}"
+              f"{best_ms(lambda: stock_index(repository), args.repeat):>15.2f}{returned:>15}")
+
+if __name__ == "__main__":
+    main()
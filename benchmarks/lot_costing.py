@@ -0,0 +1,92 @@
+"""
+Lot costing cost: a per-row Python lot queue versus the NumPy LotLedger, and
+a full rebuild versus appending the latest transactions.
+
+For growing transaction counts, costs one unit's seeded history with a
+straightforward loop over a deque of lots (FIFO) or a running average (WAVG),
+checks the LotLedger agrees on COGS and stock value, then times a full
+build_ledger against appending a batch of new rows to an existing ledger:
+    python -m benchmarks.lot_costing [--sizes 1000 10000 50000] [--append 10] [--repeat 5]
+"""
+import time
+import argparse
+import logging
+from collections import deque
+from typing import Callable, Tuple
+
+import pandas as pd
+
+from data.costing import METHODS, build_ledger
+from data.repository import Query
+from benchmarks.seed import seeded_sqlite
+
+def reference(transactions: pd.DataFrame, method: str) -> Tuple[float, float]:
+    """(COGS, stock value) costed one row at a time"""
+    lots, average, stock, last_cost, cogs = deque(), 0.0, 0.0, 0.0, 0.0
+    for row in transactions.sort_values(['date', 'id'], kind='stable').itertuples():
+        if row.transaction_type == 'Purchase':
+            unit_cost = row.total_amount / row.quantity_kg if row.quantity_kg > 0 else 0.0
+            lots.append([row.quantity_kg, unit_cost])
+            average = (average * stock + row.total_amount) / (stock + row.quantity_kg) if stock + row.quantity_kg > 0 else average
+            stock += row.quantity_kg
+            last_cost = unit_cost if row.quantity_kg > 0 else last_cost
+        elif row.transaction_type == 'Sale':
+            if method == "wavg":
+                cogs += row.quantity_kg * average
+            wanted = row.quantity_kg
+            while wanted > 0 and lots:
+                taken = min(wanted, lots[0][0])
+                cogs += taken * lots[0][1] if method == "fifo" else 0.0
+                lots[0][0] -= taken
+                wanted -= taken
+                if lots[0][0] <= 1e-12:
+                    lots.popleft()
+            cogs += wanted * last_cost if method == "fifo" else 0.0
+            stock = max(stock - row.quantity_kg, 0.0)
+    value = sum(kg * cost for kg, cost in lots) if method == "fifo" else sum(kg for kg, _ in lots) * average
+    return cogs, value
+
+def best_ms(operation: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="inventory rows to seed")
+    parser.add_argument("--append", type=int, default=10, help="latest rows appended incrementally")
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions (best is reported)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    print(f"{'rows':>8}{'method':>8}{'python ms':>12}{'ledger ms':>12}{'append ms':>12}")
+    for size in args.sizes:
+        repository = seeded_sqlite(inventory=size, expenses=0)
+        inventory = pd.DataFrame(repository.fetch(Query("inventory", "id, date, transaction_type, quantity_kg, total_amount, business_unit")))
+        inventory = inventory[inventory['business_unit'] == 'Unit A']
+        inventory['date'] = pd.to_datetime(inventory['date'], format="ISO8601")
+        inventory = inventory.sort_values(['date', 'id'], kind='stable')
+        history, latest = inventory.iloc[:-args.append], inventory.iloc[-args.append:]
+        for method in METHODS:
+            ledger = build_ledger(inventory, method)
+            cogs, value = reference(inventory, method)
+            summary = ledger.summary()
+            for name, expected, actual in (("cogs", cogs, summary["cogs"]), ("stock_value", value, summary["stock_value"])):
+                assert abs(expected - actual) < 1e-6 * max(1.0, abs(expected)), f"{method} {name} mismatch"
+
+            def append() -> None:
+                ledger = build_ledger(history, method)
+                started = time.perf_counter()
+                ledger.append(latest)
+                append.elapsed = min(append.elapsed, (time.perf_counter() - started) * 1000)
+            append.elapsed = float("inf")
+            for _ in range(args.repeat):
+                append()
+            print(f"{size:>8}{method:>8}{best_ms(lambda: reference(inventory, method), args.repeat):>12.2f}"
+                  f"{best_ms(lambda: build_ledger(inventory, method), args.repeat):>12.2f}{append.elapsed:>12.2f}")
+
+if __name__ == "__main__":
+    main()
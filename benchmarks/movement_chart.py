@@ -0,0 +1,71 @@
+"""
+Inventory movement chart cost: raw transactions versus the trigger-maintained
+inventory_rollups table.
+
+For growing transaction counts, times building the stock-level series from
+every inventory row (download, sort, signed cumulative sum) against reading
+the daily or monthly rollups, and reports how many points each hands to the
+chart, on a seeded local SQLite database:
+    python -m benchmarks.movement_chart [--sizes 1000 10000 50000] [--repeat 5]
+"""
+import time
+import argparse
+import logging
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from data.queries import MAX_CHART_POINTS, downsample
+from data.repository import Query, Repository
+from benchmarks.seed import seeded_sqlite
+
+def from_transactions(repository: Repository) -> pd.DataFrame:
+    """One point per transaction, as the report used to plot"""
+    inventory = pd.DataFrame(repository.fetch(Query("inventory", "date, transaction_type, quantity_kg")))
+    inventory = inventory.sort_values('date')
+    signed = np.where(inventory['transaction_type'] == 'Sale', -1.0, 1.0) * inventory['quantity_kg']
+    return pd.DataFrame({'period': inventory['date'], 'stock_kg': signed.cumsum()})
+
+def from_rollups(repository: Repository) -> pd.DataFrame:
+    """Daily or monthly rollups, downsampled to MAX_CHART_POINTS"""
+    days = repository.count(Query("inventory_rollups").eq("grain", "day"))
+    grain = "day" if days <= MAX_CHART_POINTS else "month"
+    rollups = pd.DataFrame(repository.fetch(
+        Query("inventory_rollups", "period, purchased_kg, sold_kg, purchase_cost, sales_revenue").eq("grain", grain)
+    ))
+    totals = rollups.groupby('period', sort=True).sum()
+    movement = pd.DataFrame({
+        'period': totals.index,
+        'net_kg': (totals['purchased_kg'] - totals['sold_kg']).to_numpy(),
+        'net_amount': (totals['purchase_cost'] - totals['sales_revenue']).to_numpy(),
+    })
+    movement['stock_kg'] = movement['net_kg'].cumsum()
+    return downsample(movement)
+
+def best_ms(operation: Callable[[], pd.DataFrame], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="inventory rows to seed")
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions (best is reported)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    print(f"{'rows':>8}{'raw ms':>10}{'raw points':>12}{'rollup ms':>11}{'rollup points':>15}")
+    for size in args.sizes:
+        repository = seeded_sqlite(inventory=size, expenses=0)
+        raw, rolled = from_transactions(repository), from_rollups(repository)
+        assert abs(raw['stock_kg'].iloc[-1] - rolled['stock_kg'].iloc[-1]) < 1e-6 * max(1.0, abs(raw['stock_kg'].iloc[-1])), \
+            "final stock mismatch"
+        print(f"{size:>8}{best_ms(lambda: from_transactions(repository), args.repeat):>10.2f}{len(raw):>12}"
+              f"{best_ms(lambda: from_rollups(repository), args.repeat):>11.2f}{len(rolled):>15}")
+
+if __name__ == "__main__":
+    main()
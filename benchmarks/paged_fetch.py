@@ -0,0 +1,55 @@
+"""
+Peak memory and time: one-shot fetch versus paged streaming into columns.
+
+Reads the whole inventory table of a seeded local SQLite database either as
+one list of row dicts turned into a DataFrame, or page by page through
+fetch_frame's ColumnBuffer, and reports the peak Python allocation of each:
+    python -m benchmarks.paged_fetch [--rows 200000] [--page-size 1000]
+"""
+import time
+import argparse
+import logging
+import tracemalloc
+from typing import Callable, Tuple
+
+import pandas as pd
+
+from data.repository import Query, Repository
+from data.projections import InventoryHistoryView, columns
+from data.queries import ColumnBuffer
+from benchmarks.seed import seeded_sqlite
+
+def one_shot(repository: Repository) -> pd.DataFrame:
+    return pd.DataFrame(repository.fetch(Query("inventory", columns(InventoryHistoryView))))
+
+def streamed(repository: Repository, page_size: int) -> pd.DataFrame:
+    query = Query("inventory", columns(InventoryHistoryView))
+    buffer = ColumnBuffer(InventoryHistoryView, repository.count(query))
+    for page in repository.pages(query, page_size):
+        buffer.extend(page)
+    return buffer.frame()
+
+def profile(read: Callable[[], pd.DataFrame]) -> Tuple[int, float, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    frame = read()
+    elapsed = (time.perf_counter() - started) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(frame), peak / 2 ** 20, elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="inventory rows to seed")
+    parser.add_argument("--page-size", type=int, default=1000, help="rows per page when streaming")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    repository = seeded_sqlite(inventory=args.rows, expenses=10)
+    for name, read in (("one-shot", lambda: one_shot(repository)),
+                       ("streamed", lambda: streamed(repository, args.page_size))):
+        rows, peak_mb, elapsed = profile(read)
+        print(f"{name:<10}{rows:>10} rows  peak {peak_mb:>8.1f} MB  {elapsed:>8.0f} ms")
+
+if __name__ == "__main__":
+    main()
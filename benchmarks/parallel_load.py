@@ -0,0 +1,67 @@
+"""
+First-load latency: sequential table fetches versus load_tables.
+
+Adds a fixed round-trip delay to every read of a seeded local SQLite database
+to stand in for the network, then loads the session tables one after another
+and concurrently:
+    python -m benchmarks.parallel_load [--rtt-ms 80] [--rows 10000]
+"""
+import time
+import argparse
+import logging
+from typing import Any, Dict, Iterator, List
+
+from data.repository import PAGE_SIZE, Query, Repository
+from data.queries import fetch_frame
+from data.shared_tables import SESSION_TABLES, SESSION_VIEWS, load_tables
+from benchmarks.seed import seeded_sqlite
+
+class DelayedRepository:
+    """Read-only view of a repository that sleeps for one round trip per fetch or count"""
+
+    def __init__(self, backend: Repository, rtt: float, slow: Dict[str, float] = None):
+        self.backend = backend
+        self.rtt = rtt
+        self.slow = slow or {}
+
+    def fetch(self, query: Query) -> List[Dict[str, Any]]:
+        time.sleep(self.rtt + self.slow.get(query.table, 0.0))
+        return self.backend.fetch(query)
+
+    def count(self, query: Query) -> int:
+        time.sleep(self.rtt + self.slow.get(query.table, 0.0))
+        return self.backend.count(query)
+
+    def pages(self, query: Query, page_size: int = PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        # Paged like any backend, one delayed fetch per page
+        return Repository.pages(self, query, page_size)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rtt-ms", type=float, default=80.0, help="simulated round trip per request")
+    parser.add_argument("--rows", type=int, default=10000, help="inventory rows to seed")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    source = DelayedRepository(seeded_sqlite(inventory=args.rows), args.rtt_ms / 1000)
+
+    started = time.perf_counter()
+    for name, query in SESSION_TABLES.items():
+        fetch_frame(query, SESSION_VIEWS[name], source)
+    sequential = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    results, errors = load_tables(SESSION_TABLES, source=source)
+    concurrent = (time.perf_counter() - started) * 1000
+    print(f"{len(SESSION_TABLES)} tables, {args.rtt_ms:.0f} ms RTT: "
+          f"sequential {sequential:.0f} ms, concurrent {concurrent:.0f} ms ({len(errors)} failed)")
+
+    # One table stalls past its timeout: the rest still load
+    stalled = DelayedRepository(source.backend, args.rtt_ms / 1000, slow={"investments": 2.0})
+    started = time.perf_counter()
+    results, errors = load_tables(SESSION_TABLES, timeouts={"investments": 0.5}, source=stalled)
+    print(f"with investments stalled: loaded {sorted(results)}, failed {errors} "
+          f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+A PostgREST stand-in over the local SQLite backend.
+
+Lets SupabaseRepository run without a hosted project: the real postgrest
+client builds its requests as usual and an httpx MockTransport answers them
+from a SQLiteRepository. Filters, select, order, limit/offset, exact counts,
+inserts, upserts, updates, deletes and rpc calls are translated to the
+repository's Query. Unknown columns and database errors come back as HTTP
+400, as they do from PostgREST, so a request that would fail on the hosted
+backend fails here too (SQLite itself reads an unknown quoted column as a
+string literal, so columns are checked against the table first).
+"""
+import re
+import json
+from typing import Any, Callable, Dict, List, Set
+
+import httpx
+from postgrest import SyncPostgrestClient
+
+from data.repository import Query, SQLiteRepository, SupabaseRepository
+
+BASE_URL = "http://postgrest.local"
+
+# Query string parameters that are not column filters
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+def _in_values(text: str) -> List[str]:
+    """Items of an in.(a,"b,c") filter value"""
+    return [v[1:-1] if v.startswith('"') else v for v in re.findall(r'"[^"]*"|[^,]+', text[1:-1])]
+
+def request_query(table: str, params: httpx.QueryParams) -> Query:
+    """The Query a PostgREST request's parameters describe"""
+    query = Query(table, params.get("select", "*"))
+    for column, condition in params.multi_items():
+        if column in RESERVED_PARAMS:
+            continue
+        op, _, value = condition.partition(".")
+        if op == "in":
+            query = query.in_(column, _in_values(value))
+        elif op == "is":
+            query = query.is_(column, None if value == "null" else value == "true")
+        else:
+            query = getattr(query, op)(column, value)
+    for term in filter(None, params.get("order", "").split(",")):
+        column, _, direction = term.partition(".")
+        query = query.order(column, desc=direction.startswith("desc"))
+    if "limit" in params:
+        query = query.limit(int(params["limit"]))
+    if "offset" in params:
+        query = query.offset(int(params["offset"]))
+    return query
+
+def _check_columns(query: Query, known: Set[str]) -> None:
+    used = [c for c in query.column_names() if c != "*"]
+    used += [column for column, _, _ in query.filters] + [column for column, _ in query.ordering]
+    for column in used:
+        if column not in known:
+            raise ValueError(f"column {query.table}.{column} does not exist")
+
+def _response(data: Any, status: int = 200, **headers: str) -> httpx.Response:
+    return httpx.Response(status, content=json.dumps(data, default=str),
+                          headers={"content-type": "application/json", **headers})
+
+def _handler(backend: SQLiteRepository) -> Callable[[httpx.Request], httpx.Response]:
+    tables: Dict[str, Set[str]] = {}
+
+    def table_query(table: str, params: httpx.QueryParams) -> Query:
+        if table not in tables:
+            tables[table] = {row["name"] for row in backend.execute(f"PRAGMA table_info({backend._ident(table)})")}
+        query = request_query(table, params)
+        _check_columns(query, tables[table])
+        return query
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        path = request.url.path.strip("/").split("/")
+        params = request.url.params
+        body = json.loads(request.content) if request.content else None
+        prefer = request.headers.get("prefer", "")
+        try:
+            if len(path) > 1 and path[-2] == "rpc":
+                return _response(backend.rpc(path[-1], body or {}))
+            table = path[-1]
+            if request.method in ("GET", "HEAD"):
+                query = table_query(table, params)
+                rows = [] if request.method == "HEAD" else backend.fetch(query)
+                if "count=exact" in prefer:
+                    return _response(rows, **{"content-range": f"*/{backend.count(query)}"})
+                return _response(rows)
+            if request.method == "POST":
+                if "resolution=merge-duplicates" in prefer:
+                    return _response(backend.upsert(table, body, params.get("on_conflict")))
+                return _response(backend.insert(table, body))
+            if request.method == "PATCH":
+                return _response(backend.update(table_query(table, params), body))
+            if request.method == "DELETE":
+                return _response(backend.delete(table_query(table, params)))
+            return _response({"message": f"Unsupported method {request.method}"}, 405)
+        except Exception as e:
+            return _response({"message": str(e), "code": "400", "hint": None, "details": None}, 400)
+    return handle
+
+def standin_repository(backend: SQLiteRepository) -> SupabaseRepository:
+    """A SupabaseRepository whose requests are answered from backend"""
+    session = httpx.Client(base_url=BASE_URL, transport=httpx.MockTransport(_handler(backend)))
+    return SupabaseRepository(SyncPostgrestClient(BASE_URL, http_client=session))
@@ -0,0 +1,72 @@
+"""
+Payload size and decode time of select("*") versus the projected columns.
+
+Each page's reads are run twice against a seeded local SQLite database: once
+selecting every column and once selecting only the view's columns. Rows are
+serialised to JSON (what PostgREST sends over the wire) and decoded back into
+DataFrames, the same work the app does per rerun:
+    python -m benchmarks.projection_payload [--rows 10000] [--repeat 5]
+"""
+import json
+import time
+import argparse
+import logging
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from data.repository import Query, Repository
+from data.projections import (
+    InventoryValueView, InventoryHistoryView, ExpenseAmountView, ExpenseHistoryView,
+    InvestmentAmountView, InvestmentHistoryView, PartnerProfitView, columns
+)
+from benchmarks.seed import UNITS, seeded_sqlite
+
+# (table, view) pairs read by each page for a single business unit
+PAGES: Dict[str, List[Tuple[str, type]]] = {
+    "dashboard": [("inventory", InventoryValueView), ("expenses", ExpenseAmountView)],
+    "inventory": [("inventory", InventoryHistoryView)],
+    "expenses": [
+        ("inventory", InventoryValueView), ("investments", InvestmentAmountView),
+        ("expenses", ExpenseAmountView), ("expenses", ExpenseHistoryView),
+        ("partnerships", PartnerProfitView)
+    ],
+    "investments": [("investments", InvestmentHistoryView)],
+    "reports": [
+        ("inventory", InventoryValueView), ("inventory", InventoryHistoryView),
+        ("expenses", ExpenseAmountView), ("partnerships", PartnerProfitView)
+    ],
+}
+
+def page_cost(repository: Repository, reads: List[Tuple[str, type]], projected: bool, repeat: int) -> Tuple[int, float]:
+    """Bytes on the wire and best-of-repeat decode time in ms for one page"""
+    payloads = []
+    for table, view in reads:
+        query = Query(table, columns(view) if projected else "*").eq("business_unit", UNITS[0])
+        payloads.append(json.dumps(repository.fetch(query)))
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for payload in payloads:
+            pd.DataFrame(json.loads(payload))
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return sum(len(p.encode("utf-8")) for p in payloads), best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="inventory rows to seed")
+    parser.add_argument("--repeat", type=int, default=5, help="decode repetitions (best is reported)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    repository = seeded_sqlite(inventory=args.rows)
+    print(f"SQLite backend at {repository.path} ({args.rows} inventory rows)")
+    print(f"{'page':<14}{'select * KB':>13}{'projected KB':>14}{'saved':>8}{'* ms':>9}{'proj ms':>9}")
+    for page, reads in PAGES.items():
+        full_bytes, full_ms = page_cost(repository, reads, False, args.repeat)
+        proj_bytes, proj_ms = page_cost(repository, reads, True, args.repeat)
+        saved = 1 - proj_bytes / full_bytes if full_bytes else 0.0
+        print(f"{page:<14}{full_bytes / 1024:>13.1f}{proj_bytes / 1024:>14.1f}{saved:>8.0%}{full_ms:>9.2f}{proj_ms:>9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Throughput and latency benchmark for the repository layer.
+
+Runs the app's typical reads and writes against a freshly seeded local SQLite
+database (no network needed):
+    python -m benchmarks.repository_throughput [--rows 10000] [--seconds 3] [--threads 4]
+"""
+import time
+import argparse
+import logging
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Callable, Dict, List
+
+from data.repository import Query, Repository
+from benchmarks.seed import UNITS, seeded_sqlite
+
+def workload(repository: Repository) -> Dict[str, Callable[[int], None]]:
+    """Named operations mirroring what the pages issue on every rerun"""
+    return {
+        "fetch_inventory(unit)": lambda i: repository.fetch(Query("inventory").eq("business_unit", UNITS[i % 2])),
+        "recent_transactions": lambda i: repository.fetch(
+            Query("inventory").eq("business_unit", UNITS[i % 2]).order("date", desc=True).limit(10)
+        ),
+        "fetch_cash_balances": lambda i: repository.fetch(Query("cash_balances")),
+        "latest_market_price": lambda i: repository.fetch(
+            Query("market_prices", "price, date").order("date", desc=True).limit(1)
+        ),
+        "add_inventory_record": lambda i: repository.insert("inventory", {
+            "date": date.today().isoformat(), "transaction_type": "Purchase", "quantity_kg": 10.0,
+            "unit_price": 50.0, "total_amount": 500.0, "remarks": "bench", "business_unit": UNITS[i % 2]
+        }),
+        "upsert_cash_balance": lambda i: repository.upsert("cash_balances", {
+            "business_unit": UNITS[i % 2], "balance": 1000000.0 + i
+        }),
+    }
+
+def measure(operation: Callable[[int], None], seconds: float, threads: int) -> Dict[str, float]:
+    """Run operation from several threads for a fixed time and collect latencies"""
+    deadline = time.perf_counter() + seconds
+
+    def worker(offset: int) -> List[float]:
+        latencies, i = [], offset
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            operation(i)
+            latencies.append((time.perf_counter() - started) * 1000)
+            i += threads
+        return latencies
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(l for result in pool.map(worker, range(threads)) for l in result)
+    return {
+        "ops_per_sec": len(latencies) / seconds,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0],
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="inventory rows to seed")
+    parser.add_argument("--seconds", type=float, default=3.0, help="duration per operation")
+    parser.add_argument("--threads", type=int, default=4, help="concurrent workers")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    repository = seeded_sqlite(inventory=args.rows)
+    print(f"SQLite backend at {repository.path} ({args.rows} inventory rows, {args.threads} threads)")
+    print(f"{'operation':<26}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, operation in workload(repository).items():
+        result = measure(operation, args.seconds, args.threads)
+        print(f"{name:<26}{result['ops_per_sec']:>10.0f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}")
+
+if __name__ == "__main__":
+    main()
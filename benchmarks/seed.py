@@ -0,0 +1,95 @@
+"""
+Synthetic data generator for benchmarks against the local SQLite backend.
+
+Produces realistic-looking weigh-bridge purchases/sales, expenses, investments,
+partners, market prices and cash balances for the two business units.
+"""
+import random
+import tempfile
+from datetime import date, timedelta
+from typing import Dict, List
+
+from data.repository import Repository, SQLiteRepository
+
+UNITS = ["Unit A", "Unit B"]
+EXPENSE_CATEGORIES = ["Operational", "Personnel", "Logistics", "Marketing", "Utilities", "Rent", "Other"]
+PAYMENT_METHODS = ["Cash", "Bank Transfer", "Credit Card", "Cheque"]
+BATCH_SIZE = 1000
+
+def inventory_rows(count: int, start: date = date(2020, 1, 1), seed: int = 7) -> List[Dict]:
+    """Generate purchases and sales spread evenly over the period since start"""
+    rng = random.Random(seed)
+    span = max((date.today() - start).days, 1)
+    rows = []
+    for i in range(count):
+        is_sale = rng.random() < 0.45
+        quantity = round(rng.uniform(50, 2500), 3)
+        price = round(rng.uniform(40, 65) * (1.12 if is_sale else 1.0), 2)
+        rows.append({
+            "date": (start + timedelta(days=i * span // max(count, 1))).isoformat(),
+            "transaction_type": "Sale" if is_sale else "Purchase",
+            "quantity_kg": quantity,
+            "unit_price": price,
+            "total_amount": round(quantity * price, 2),
+            "remarks": f"{'Customer' if is_sale else 'Supplier'} {rng.randint(1, 200)}",
+            "business_unit": UNITS[i % len(UNITS)]
+        })
+    return rows
+
+def expense_rows(count: int, start: date = date(2020, 1, 1), seed: int = 11) -> List[Dict]:
+    """Generate operating expenses spread evenly over the period since start"""
+    rng = random.Random(seed)
+    span = max((date.today() - start).days, 1)
+    return [{
+        "date": (start + timedelta(days=i * span // max(count, 1))).isoformat(),
+        "category": rng.choice(EXPENSE_CATEGORIES),
+        "amount": round(rng.uniform(20, 5000), 2),
+        "description": f"Expense {i}",
+        "business_unit": UNITS[i % len(UNITS)],
+        "payment_method": rng.choice(PAYMENT_METHODS),
+        "partner": None
+    } for i in range(count)]
+
+def investment_rows(count: int, seed: int = 13) -> List[Dict]:
+    """Generate capital injections"""
+    rng = random.Random(seed)
+    return [{
+        "business_unit": UNITS[i % len(UNITS)],
+        "inv_date": (date(2020, 1, 1) + timedelta(days=i * 7)).isoformat(),
+        "amount": round(rng.uniform(1000, 50000), 2),
+        "investor": f"Investor {rng.randint(1, 20)}",
+        "description": "Capital injection"
+    } for i in range(count)]
+
+def partner_rows() -> List[Dict]:
+    """Default partner split used by the app"""
+    return [
+        {"business_unit": "Unit A", "partner_name": "Ahmed", "share": 60.0, "withdrawn": 0.0, "invested": 0.0},
+        {"business_unit": "Unit A", "partner_name": "Fatima", "share": 40.0, "withdrawn": 0.0, "invested": 0.0},
+        {"business_unit": "Unit B", "partner_name": "Ali", "share": 50.0, "withdrawn": 0.0, "invested": 0.0},
+        {"business_unit": "Unit B", "partner_name": "Mariam", "share": 50.0, "withdrawn": 0.0, "invested": 0.0}
+    ]
+
+def insert_batched(repository: Repository, table: str, rows: List[Dict]) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        repository.insert(table, rows[start:start + BATCH_SIZE])
+
+def seed(repository: Repository, inventory: int = 10000, expenses: int = 2000, investments: int = 100) -> None:
+    """Populate every table used by the app"""
+    insert_batched(repository, "inventory", inventory_rows(inventory))
+    insert_batched(repository, "expenses", expense_rows(expenses))
+    insert_batched(repository, "investments", investment_rows(investments))
+    repository.insert("partnerships", partner_rows())
+    for unit in UNITS:
+        repository.rpc("open_cash_balance", {"p_business_unit": unit, "p_balance": 1000000.0})
+    repository.insert("market_prices", [
+        {"price": round(50 + (i % 15) * 0.5, 2), "date": (date.today() - timedelta(days=i)).isoformat()}
+        for i in range(90)
+    ])
+
+def seeded_sqlite(inventory: int = 10000, expenses: int = 2000, investments: int = 100) -> SQLiteRepository:
+    """Create a throwaway SQLite database and seed it"""
+    path = tempfile.NamedTemporaryFile(prefix="bizmaster_bench_", suffix=".db", delete=False).name
+    repository = SQLiteRepository(path)
+    seed(repository, inventory, expenses, investments)
+    return repository
@@ -0,0 +1,54 @@
+"""
+Memory per session: private DataFrame copies versus views of the shared snapshot.
+
+Loads the session tables of a seeded local SQLite database once, then builds
+the state of N sessions the old way (every session holds its own copy of
+the loaded frames) and the new way (every session takes session_view of the
+shared frames), reporting the bytes each session adds:
+    python -m benchmarks.session_memory [--rows 100000] [--sessions 20]
+"""
+import argparse
+import logging
+import tracemalloc
+from typing import Callable, Dict, List
+
+import pandas as pd
+import pyarrow as pa
+
+from data.shared_tables import DELTA_TABLES, SESSION_TABLES, load_tables, session_view
+from benchmarks.seed import seeded_sqlite
+
+def allocated() -> int:
+    """Bytes currently held by Python/numpy plus Arrow-backed string columns"""
+    return tracemalloc.get_traced_memory()[0] + pa.total_allocated_bytes()
+
+def measure(build: Callable[[], Dict[str, pd.DataFrame]], sessions: int) -> float:
+    before = allocated()
+    states: List[Dict[str, pd.DataFrame]] = [build() for _ in range(sessions)]
+    per_session = (allocated() - before) / sessions
+    del states
+    return per_session
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="inventory rows to seed")
+    parser.add_argument("--sessions", type=int, default=20, help="simulated sessions")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    repository = seeded_sqlite(inventory=args.rows, expenses=args.rows // 10)
+    queries = {name: SESSION_TABLES[name] for name in DELTA_TABLES}
+    shared, _ = load_tables(queries, source=repository)
+
+    tracemalloc.start()
+    private = measure(lambda: {name: frame.copy(deep=True) for name, frame in shared.items()}, args.sessions)
+    viewed = measure(lambda: {name: session_view(frame) for name, frame in shared.items()}, args.sessions)
+    unit = measure(lambda: {name: session_view(frame, "Unit A") for name, frame in shared.items()}, args.sessions)
+    tracemalloc.stop()
+
+    print(f"private copies     {private / 2 ** 20:>10.2f} MB per session")
+    print(f"shared, all units  {viewed / 2 ** 20:>10.2f} MB per session")
+    print(f"shared, one unit   {unit / 2 ** 20:>10.2f} MB per session")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Startup timing report: one Supabase client per module vs one shared pooled client.
+
+Run from the repository root:
+    python -m benchmarks.startup_clients [--modules 10] [--with-requests]
+
+Without --with-requests only client construction is timed (works offline).
+With --with-requests every client also issues one lightweight query, which
+includes the TLS handshake each legacy client paid on its first request.
+"""
+import time
+import argparse
+import logging
+from typing import Callable, List
+
+from supabase import create_client
+
+from data.client import SUPABASE_URL, SUPABASE_KEY, build_client, create_http_client
+
+# The modules that used to call create_client at import time
+LEGACY_MODULES = [
+    "app", "components.auth", "components.inventory", "components.expenses",
+    "components.reports", "components.investments", "components.partnership",
+    "components.user_management", "components.cash_management",
+    "components.dashboard", "data.session_state", "utils"
+]
+
+def ping(client) -> None:
+    """Issue the cheapest possible PostgREST request"""
+    client.table("market_prices").select("id").limit(1).execute()
+
+def time_ms(func: Callable[[], None]) -> float:
+    """Run func once and return the elapsed wall time in milliseconds"""
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+def legacy_startup(modules: int, with_requests: bool) -> None:
+    """Old behaviour: every module builds (and warms) its own client"""
+    clients = [create_client(SUPABASE_URL, SUPABASE_KEY) for _ in range(modules)]
+    if with_requests:
+        for client in clients:
+            ping(client)
+
+def shared_startup(modules: int, with_requests: bool) -> None:
+    """New behaviour: one pooled client, reused by every module"""
+    client = build_client(create_http_client())
+    if with_requests:
+        for _ in range(modules):
+            ping(client)
+
+def run(modules: int, with_requests: bool, repeat: int) -> List[float]:
+    legacy = min(time_ms(lambda: legacy_startup(modules, with_requests)) for _ in range(repeat))
+    shared = min(time_ms(lambda: shared_startup(modules, with_requests)) for _ in range(repeat))
+    return [legacy, shared]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", type=int, default=len(LEGACY_MODULES),
+                        help="number of modules that previously created a client")
+    parser.add_argument("--with-requests", action="store_true",
+                        help="issue one query per module (requires network access)")
+    parser.add_argument("--repeat", type=int, default=3, help="best-of-N repetitions")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    legacy, shared = run(args.modules, args.with_requests, args.repeat)
+
+    print(f"Startup timing ({args.modules} modules, requests={'yes' if args.with_requests else 'no'}, best of {args.repeat})")
+    print(f"  per-module clients : {legacy:10.1f} ms")
+    print(f"  shared pooled client: {shared:10.1f} ms")
+    print(f"  saved              : {legacy - shared:10.1f} ms ({(1 - shared / legacy) * 100 if legacy else 0:.0f}%)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Check the Supabase repository's read paths against the local backend.
+
+Seeds a local SQLite database, serves it through the PostgREST stand-in
+(benchmarks/postgrest_standin.py) and compares what SupabaseRepository
+returns, paged or not, with what SQLiteRepository returns for the same
+queries. Exits non-zero on the first mismatch or error:
+    python -m benchmarks.supabase_paths [--rows 3000]
+"""
+import sys
+import argparse
+import logging
+from typing import Any, Callable, List, Tuple
+
+from data.repository import Query, Repository
+from data.projections import InventoryHistoryView, RollupView, UnitStockView, columns
+from benchmarks.seed import seeded_sqlite
+from benchmarks.postgrest_standin import standin_repository
+
+Check = Tuple[str, Callable[[Repository], Any]]
+
+def _sorted(rows: List[dict]) -> List[dict]:
+    return sorted(rows, key=lambda row: sorted((k, str(v)) for k, v in row.items()))
+
+def _paged(query: Query, page_size: int) -> Callable[[Repository], Any]:
+    return lambda repository: [row for page in repository.pages(query, page_size) for row in page]
+
+STOCK = Query("unit_stock", columns(UnitStockView))
+HISTORY = Query("inventory", columns(InventoryHistoryView))
+DAILY = Query("inventory_rollups", columns(RollupView)).eq("grain", "day")
+
+CHECKS: List[Check] = [
+    ("unit_stock fetch", lambda repository: _sorted(repository.fetch(STOCK))),
+    ("unit_stock fetch one unit", lambda repository: repository.fetch(STOCK.eq("business_unit", "Unit A"))),
+    ("unit_stock pages", lambda repository: _paged(STOCK, 1)(repository)),
+    ("inventory_rollups fetch", lambda repository: repository.fetch(DAILY.order("period").order("business_unit"))),
+    ("inventory_rollups pages", lambda repository: _sorted(_paged(DAILY.eq("business_unit", "Unit A"), 100)(repository))),
+    ("inventory_rollups count", lambda repository: repository.count(DAILY)),
+    ("inventory fetch (keyset pages)", lambda repository: repository.fetch(HISTORY)),
+    ("inventory fetch ordered", lambda repository: repository.fetch(HISTORY.order("date", desc=True).order("id"))),
+    ("inventory count", lambda repository: repository.count(HISTORY.eq("business_unit", "Unit B"))),
+]
+
+def run(expected: Repository, actual: Repository) -> bool:
+    ok = True
+    for name, read in CHECKS:
+        try:
+            want, got = read(expected), read(actual)
+            passed = want == got
+            detail = "" if passed else f"  expected {str(want)[:80]}, got {str(got)[:80]}"
+        except Exception as e:
+            passed, detail = False, f"  {type(e).__name__}: {str(e)[:120]}"
+        ok = ok and passed
+        print(f"{'ok' if passed else 'FAIL':<6}{name}{detail}")
+    return ok
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3000, help="inventory rows to seed (more than one page)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    sqlite = seeded_sqlite(inventory=args.rows, expenses=10)
+    sys.exit(0 if run(sqlite, standin_repository(sqlite)) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Cold versus warm load of the delta session tables.
+
+Loads inventory, expenses and investments of a seeded local SQLite database
+the way a new session does without a warm cache (fetch every row and build
+frames), then from Arrow snapshots written by data.warm_cache:
+    python -m benchmarks.warm_start [--rows 200000]
+"""
+import time
+import argparse
+import logging
+import tempfile
+
+import pandas as pd
+
+from data import warm_cache
+from data.repository import Query
+from data.projections import column_list, columns
+from data.schema import coerce
+from data.shared_tables import DELTA_TABLES
+from benchmarks.seed import seeded_sqlite
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="inventory rows to seed")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    repository = seeded_sqlite(inventory=args.rows, expenses=args.rows // 10)
+    warm_cache.WARM_CACHE_DIR = tempfile.mkdtemp(prefix="bizmaster_warm_")
+
+    started = time.perf_counter()
+    frames = {
+        name: coerce(pd.DataFrame(repository.fetch(Query(name, columns(view))), columns=column_list(view)), name)
+        for name, (_, view) in DELTA_TABLES.items()
+    }
+    cold = (time.perf_counter() - started) * 1000
+
+    for name, (_, view) in DELTA_TABLES.items():
+        warm_cache.save(name, frames[name], view, int(frames[name]['id'].max()))
+    started = time.perf_counter()
+    loaded = {name: warm_cache.load(name, view) for name, (_, view) in DELTA_TABLES.items()}
+    warm = (time.perf_counter() - started) * 1000
+
+    rows = sum(len(frame) for frame in frames.values())
+    assert rows == sum(len(frame) for frame, _ in loaded.values())
+    print(f"cold (fetch){rows:>10} rows  {cold:>8.0f} ms")
+    print(f"warm (disk) {rows:>10} rows  {warm:>8.0f} ms")
+
+if __name__ == "__main__":
+    main()
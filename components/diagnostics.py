@@ -0,0 +1,125 @@
+import sys
+import streamlit as st
+import pandas as pd
+import numpy as np
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, Tuple
+from components.auth import require_permission
+from data import memo, payload
+from data.repository import Query, get_repository
+from data.shared_tables import shared_tables
+from data.snapshots import BUSINESS_UNITS, latest_snapshot, take_snapshots
+
+# Size of a session state value
+def deep_size(value: Any, seen: set = None) -> int:
+    """Approximate bytes held by a value, following containers and counting each object once"""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in value)
+    return size
+
+def iter_frames(state: Dict[str, Any]) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """DataFrames held in session state, including those nested one level in dicts (e.g. partners)"""
+    for key, value in state.items():
+        if isinstance(value, pd.DataFrame):
+            yield key, value
+        elif isinstance(value, dict):
+            for inner, frame in value.items():
+                if isinstance(frame, pd.DataFrame):
+                    yield f"{key}[{inner}]", frame
+
+def session_sizes(state: Dict[str, Any]) -> pd.DataFrame:
+    """Bytes per session state key, largest first"""
+    rows = [{"key": key, "type": type(value).__name__, "bytes": deep_size(value)} for key, value in state.items()]
+    sizes = pd.DataFrame(rows, columns=["key", "type", "bytes"])
+    return sizes.sort_values("bytes", ascending=False).reset_index(drop=True)
+
+@require_permission("diagnostics")
+def show_diagnostics():
+    """Admin view of this session's memory, per-page payloads and read caching"""
+    st.header("🩺 Diagnostics")
+    state = {key: st.session_state[key] for key in st.session_state.keys()}
+
+    # Session state by key
+    st.subheader("Session State")
+    sizes = session_sizes(state)
+    st.metric("Total", f"{sizes['bytes'].sum() / 1024:,.1f} KB")
+    st.dataframe(sizes.assign(KB=sizes["bytes"] / 1024).drop(columns="bytes"), hide_index=True,
+                 column_config={"KB": st.column_config.NumberColumn(format="%.1f")})
+    st.caption("Views of the shared table snapshot report the memory they reference, which is held once per process.")
+
+    # DataFrames by column
+    st.subheader("DataFrames")
+    frames = dict(iter_frames(state))
+    if frames:
+        overview = pd.DataFrame([
+            {"frame": name, "rows": len(frame), "columns": frame.shape[1],
+             "KB": frame.memory_usage(deep=True).sum() / 1024}
+            for name, frame in frames.items()
+        ]).sort_values("KB", ascending=False)
+        st.dataframe(overview, hide_index=True, column_config={"KB": st.column_config.NumberColumn(format="%.1f")})
+        name = st.selectbox("Columns of", list(overview["frame"]), key="diagnostics_frame")
+        usage = frames[name].memory_usage(deep=True, index=True)
+        st.dataframe(pd.DataFrame({
+            "dtype": [str(frames[name].index.dtype)] + [str(dtype) for dtype in frames[name].dtypes],
+            "KB": usage.to_numpy() / 1024
+        }, index=usage.index), column_config={"KB": st.column_config.NumberColumn(format="%.1f")})
+    else:
+        st.info("No DataFrames in this session")
+
+    # Websocket payload of the latest run of each page
+    st.subheader("Payload per Page")
+    sent = payload.stats()
+    if sent:
+        pages = pd.DataFrame([
+            {"page": page, "messages": run["messages"], "KB": run["bytes"] / 1024} for page, run in sent.items()
+        ]).sort_values("KB", ascending=False)
+        st.dataframe(pages, hide_index=True, column_config={"KB": st.column_config.NumberColumn(format="%.1f")})
+        st.caption("Latest run of each page in this session; open a page to measure it.")
+    else:
+        st.info("No page has been measured yet")
+
+    # Reads
+    st.subheader("Reads")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Per-run memo (latest run of each page)**")
+        st.dataframe(pd.DataFrame(memo.stats()).T, column_config={"_index": "page"})
+    with col2:
+        st.markdown("**Process-wide cache**")
+        cache = getattr(get_repository(), "cache", None)
+        if cache is not None:
+            st.dataframe(pd.Series(cache.stats(), name="count"))
+        shared = shared_tables()
+        st.markdown(
+            f"**Shared snapshot:** version {shared.version}, "
+            f"{sum(frame.memory_usage(deep=True).sum() for frame in shared.frames.values()) / 1024:,.1f} KB, "
+            f"synced {shared.synced_at:%H:%M:%S}"
+        )
+
+    # End-of-day stock snapshots (written nightly by python -m data.snapshots)
+    st.subheader("Stock Snapshots")
+    if st.button("Update Snapshots Through Yesterday", key="diagnostics_snapshots"):
+        try:
+            with st.spinner("Updating stock snapshots..."):
+                written = take_snapshots(date.today() - timedelta(days=1))
+            st.success(f"{written} snapshots written")
+        except Exception as e:
+            st.error(f"Could not update stock snapshots: {str(e)}")
+    latest = {unit: latest_snapshot(unit) for unit in BUSINESS_UNITS}
+    st.dataframe(pd.DataFrame([
+        {"unit": unit, "latest": snapshot["as_of"] if snapshot else None,
+         "count": get_repository().count(Query("stock_snapshots").eq("business_unit", unit))}
+        for unit, snapshot in latest.items()
+    ]), hide_index=True)
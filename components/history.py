@@ -0,0 +1,40 @@
+import streamlit as st
+import pandas as pd
+from data.repository import Query
+from data.projections import column_list
+from data.queries import HISTORY_PAGE_SIZE, fetch_history_page
+
+def _load_more(key: str):
+    st.session_state[key] += 1
+
+def show_history(key: str, query: Query, view: type, column_config: dict = None,
+                 page_size: int = HISTORY_PAGE_SIZE, empty_message: str = "No records found"):
+    """
+    Newest-first table of a query's rows with a "Load more" button.
+
+    Only the pages opened so far are read, each with an ordered, limited
+    query, so a page costs the same however large the table grows. Pages
+    are re-read on every run (through the read caches), so new records
+    show up at the top.
+    """
+    pages_key = f"history_pages_{key}"
+    pages = st.session_state.setdefault(pages_key, 1)
+    try:
+        frames, cursor = [], None
+        for _ in range(pages):
+            frame, cursor = fetch_history_page(query, view, cursor, page_size)
+            frames.append(frame)
+            if cursor is None:
+                break
+        history = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=column_list(view))
+    except Exception as e:
+        st.error(f"Failed to load history: {str(e)}")
+        return
+    if history.empty:
+        st.info(empty_message)
+        return
+    st.dataframe(history, column_config=column_config, hide_index=True, use_container_width=True)
+    if cursor is not None:
+        st.button("Load more", key=f"history_more_{key}", on_click=_load_more, args=(pages_key,))
+    else:
+        st.caption(f"All {len(history)} records shown")
@@ -0,0 +1,47 @@
+import streamlit as st
+from data import memo
+from data.idempotency import new_key
+
+def _state_key(form: str) -> str:
+    return f"submission_key_{form}"
+
+def submission_key(form: str) -> str:
+    """
+    Idempotency key of a form's current submission.
+
+    The key is kept until finish_submission draws the next one, so a run
+    repeated before then (double click, reconnect) writes nothing twice.
+    """
+    return st.session_state.setdefault(_state_key(form), new_key())
+
+def next_submission(form: str):
+    """
+    Draw the form's next key now, ahead of finish_submission.
+
+    For compensating writes (a refund): once they run, a replay of the
+    submission must not reuse the key of the writes they undo.
+    """
+    st.session_state[_state_key(form)] = new_key()
+
+def finish_submission(form: str, succeeded: bool, message: str = "", scope: str = "app"):
+    """
+    Report a handled submission, draw the form's next key and rerun on success.
+
+    The message is shown before the key is replaced: a run interrupted by a
+    second click stops at the message and the replay reuses the old key.
+    Forms inside a fragment pass scope="fragment" to rerun only the fragment.
+    """
+    if succeeded and message:
+        st.success(message)
+    next_submission(form)
+    if succeeded:
+        rerun(scope)
+
+def rerun(scope: str = "app"):
+    """
+    st.rerun that may be scoped to the current fragment.
+
+    A fragment handling a widget during a full run (not a fragment-only
+    rerun) cannot rerun on its own, so the whole app reruns instead.
+    """
+    st.rerun(scope="fragment" if scope == "fragment" and memo.fragment_run() else "app")
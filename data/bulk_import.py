@@ -0,0 +1,283 @@
+"""
+Bulk import of inventory transactions from CSV or Excel files.
+
+The file is parsed in chunks (CSV is streamed; Excel sheets are read whole
+and then chunked) and every chunk is validated with vectorised pandas
+checks: known transaction type and business unit, parseable date, positive
+quantity and price. Nothing is written unless every row is valid.
+
+Valid rows are inserted IMPORT_BATCH_SIZE at a time. Once every row is
+stored, the cash effect of the whole file (sales minus purchases) is applied
+as one ledger movement per unit.
+
+Every row is stored under an idempotency key made of the file's SHA-256 and
+the row's line number, and batches are upserts on that key; each unit's cash
+movement is keyed by the file's SHA-256 and the unit. Importing the same file
+again after a failure skips the rows and movements already stored, so a file
+is imported (and charged) once however often it is retried. Nothing is ever
+reversed: an interrupted import is completed by importing the file again.
+"""
+import os
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.cash import adjust_cash_balance
+from data.idempotency import retried
+from data.repository import Query, get_repository
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = int(os.getenv("BIZMASTER_IMPORT_BATCH_SIZE", "200"))
+READ_CHUNK_SIZE = 5000
+
+TRANSACTION_TYPES = ("Purchase", "Sale")
+REQUIRED_COLUMNS = ["date", "transaction_type", "quantity_kg", "unit_price"]
+OPTIONAL_COLUMNS = ["remarks", "business_unit"]
+COLUMN_ALIASES = {
+    "type": "transaction_type",
+    "quantity": "quantity_kg",
+    "qty": "quantity_kg",
+    "price": "unit_price",
+    "price_per_kg": "unit_price",
+    "unit": "business_unit",
+    "supplier": "remarks",
+    "customer": "remarks",
+    "details": "remarks",
+}
+
+class ImportFileError(ValueError):
+    """The file cannot be read as a transaction import"""
+
+@dataclass
+class ImportResult:
+    """Outcome of validating (and optionally writing) an import file"""
+    rows: pd.DataFrame
+    errors: pd.DataFrame
+    digest: str = ""
+    inserted: int = 0
+    skipped: int = 0
+    cash: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def valid(self) -> bool:
+        return self.errors.empty and not self.rows.empty
+
+def _normalise_columns(frame: pd.DataFrame) -> pd.DataFrame:
+    names = [str(c).strip().lower().replace(" ", "_").replace("(", "").replace(")", "") for c in frame.columns]
+    return frame.set_axis([COLUMN_ALIASES.get(name, name) for name in names], axis=1)
+
+def read_chunks(upload: IO, filename: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Yield the file's rows in chunks of raw strings with normalised column names.
+
+    Raises:
+        ImportFileError: If the extension is not supported or the file cannot be parsed
+    """
+    extension = os.path.splitext(filename.lower())[1]
+    try:
+        if extension == ".csv":
+            for chunk in pd.read_csv(upload, dtype=str, chunksize=chunk_size, skipinitialspace=True):
+                yield _normalise_columns(chunk)
+        elif extension in (".xlsx", ".xls"):
+            sheet = _normalise_columns(pd.read_excel(upload, dtype=str))
+            for start in range(0, len(sheet), chunk_size):
+                yield sheet.iloc[start:start + chunk_size]
+        else:
+            raise ImportFileError(f"Unsupported file type: {extension or filename}")
+    except ImportFileError:
+        raise
+    except ImportError as e:
+        raise ImportFileError(f"Reading {extension} files needs an optional package: {str(e)}")
+    except (ValueError, pd.errors.ParserError) as e:
+        raise ImportFileError(f"Could not parse {filename}: {str(e)}")
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    """ISO dates first, then day-first dates (e.g. 31/03/2024) for the rest"""
+    parsed = pd.to_datetime(values, errors="coerce", format="ISO8601")
+    missing = parsed.isna() & values.notna()
+    if missing.any():
+        parsed[missing] = pd.to_datetime(values[missing], errors="coerce", format="mixed", dayfirst=True)
+    return parsed
+
+def validate_chunk(chunk: pd.DataFrame, units: Iterable[str], default_unit: Optional[str],
+                   first_line: int = 2) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Validate one chunk with vectorised checks.
+
+    Args:
+        chunk (DataFrame): Raw string columns from read_chunks
+        units (iterable): Business units the rows may belong to
+        default_unit (str): Unit of rows without a business_unit column or value
+        first_line (int): File line number of the chunk's first row (for error messages)
+
+    Returns:
+        tuple: (rows ready to insert plus their file line, errors with line and reason columns)
+    """
+    missing = [c for c in REQUIRED_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ImportFileError(f"Missing columns: {', '.join(missing)}")
+    line = pd.Series(np.arange(first_line, first_line + len(chunk)), index=chunk.index)
+
+    types = chunk["transaction_type"].str.strip().str.capitalize()
+    dates = _parse_dates(chunk["date"].str.strip())
+    quantity = pd.to_numeric(chunk["quantity_kg"].str.replace(",", ""), errors="coerce").astype(float)
+    price = pd.to_numeric(chunk["unit_price"].str.replace(",", ""), errors="coerce").astype(float)
+    unit = chunk["business_unit"].str.strip() if "business_unit" in chunk.columns else pd.Series(None, index=chunk.index, dtype=object)
+    unit = unit.fillna(default_unit) if default_unit else unit
+    remarks = chunk["remarks"].fillna("").str.strip().str[:100] if "remarks" in chunk.columns else ""
+
+    checks = [
+        (~types.isin(TRANSACTION_TYPES), f"transaction_type must be one of {', '.join(TRANSACTION_TYPES)}"),
+        (dates.isna(), "date could not be parsed"),
+        (~(quantity > 0), "quantity_kg must be a positive number"),
+        (~(price > 0), "unit_price must be a positive number"),
+        (~unit.isin(list(units)), "unknown or not permitted business_unit"),
+    ]
+    errors = pd.concat(
+        [pd.DataFrame(columns=["line", "reason"])]
+        + [pd.DataFrame({"line": line[failed], "reason": reason}) for failed, reason in checks if failed.any()],
+        ignore_index=True
+    )
+
+    rows = pd.DataFrame({
+        "date": dates.dt.strftime("%Y-%m-%d"),
+        "transaction_type": types,
+        "quantity_kg": quantity,
+        "unit_price": price,
+        "total_amount": quantity * price,
+        "remarks": remarks,
+        "business_unit": unit,
+        "line": line,
+    })
+    bad = np.logical_or.reduce([failed.to_numpy() for failed, _ in checks])
+    return rows[~bad], errors
+
+def file_digest(upload: IO) -> str:
+    """Short SHA-256 of a file's bytes; the file is rewound for reading"""
+    upload.seek(0)
+    digest = hashlib.sha256()
+    while True:
+        block = upload.read(1 << 20)
+        if not block:
+            break
+        digest.update(block.encode() if isinstance(block, str) else block)
+    upload.seek(0)
+    return digest.hexdigest()[:16]
+
+def validate_file(upload: IO, filename: str, units: Iterable[str], default_unit: Optional[str] = None) -> ImportResult:
+    """Read and validate a whole file; the result holds every valid row and every error"""
+    units = list(units)
+    digest = file_digest(upload)
+    rows, errors, line = [], [], 2
+    for chunk in read_chunks(upload, filename):
+        valid, failed = validate_chunk(chunk, units, default_unit, first_line=line)
+        rows.append(valid)
+        errors.append(failed)
+        line += len(chunk)
+    rows = pd.concat(rows, ignore_index=True) if rows else pd.DataFrame(columns=REQUIRED_COLUMNS + OPTIONAL_COLUMNS + ["line"])
+    errors = pd.concat(errors, ignore_index=True) if errors else pd.DataFrame(columns=["line", "reason"])
+    return ImportResult(rows=rows, errors=errors.sort_values("line", kind="stable").reset_index(drop=True), digest=digest)
+
+def cash_effect(rows: pd.DataFrame) -> Dict[str, float]:
+    """Net cash movement per unit: sales add, purchases subtract"""
+    signed = np.where(rows["transaction_type"] == "Sale", 1.0, -1.0) * rows["total_amount"]
+    return signed.groupby(rows["business_unit"]).sum().round(2).to_dict()
+
+def import_key(digest: str, line: int) -> str:
+    """Idempotency key of one line of an import file"""
+    return f"import:{digest}:{line}"
+
+def cash_key(digest: str, unit: str) -> str:
+    """Idempotency key of an import file's cash movement for one unit"""
+    return f"import:{digest}:cash:{unit}"
+
+def imported_keys(keys: List[str], batch_size: int = IMPORT_BATCH_SIZE, table: str = "inventory") -> Set[str]:
+    """The keys among keys that rows of table are already stored under (read uncached)"""
+    repository = get_repository()
+    found = set()
+    for start in range(0, len(keys), batch_size):
+        query = Query(table, "idempotency_key").in_("idempotency_key", keys[start:start + batch_size])
+        for page in repository.pages(query):
+            found.update(row["idempotency_key"] for row in page)
+    return found
+
+def _check_funds(cash: Dict[str, float]) -> None:
+    balances = {row["business_unit"]: float(row["balance"] or 0.0)
+                for row in get_repository().fetch(Query("cash_balances", "business_unit, balance"))}
+    for unit, amount in cash.items():
+        if amount < 0 and balances.get(unit, 0.0) < -amount:
+            raise ValueError(f"Insufficient funds in {unit} for net purchases of AED {-amount:,.2f}")
+
+def import_rows(result: ImportResult, filename: str, apply_cash: bool = True,
+                batch_size: int = IMPORT_BATCH_SIZE) -> ImportResult:
+    """
+    Insert validated rows in batches, then move cash once per unit.
+
+    Rows and cash movements of the same file stored by an earlier attempt are
+    skipped. A failure leaves what was written in place and raises; importing
+    the file again completes it.
+
+    Args:
+        result (ImportResult): A valid result from validate_file
+        filename (str): Recorded in the cash ledger descriptions
+        apply_cash (bool): Move cash for the imported sales and purchases
+        batch_size (int): Rows per insert
+
+    Returns:
+        ImportResult: The same rows and errors, with inserted, skipped and cash filled in
+
+    Raises:
+        ValueError: If a unit lacks the cash for its net purchases (nothing is
+            written unless the balance fell after the check, in which case the
+            rows are stored and their cash is left for the next attempt)
+    """
+    if not result.valid:
+        raise ValueError("Only a file without errors can be imported")
+    repository = get_repository()
+    keys = [import_key(result.digest, line) for line in result.rows["line"]]
+    rows = result.rows.drop(columns="line").assign(idempotency_key=keys)
+    stored = imported_keys(keys, batch_size)
+    if stored:
+        logger.info(f"{len(stored)} rows of {filename} were imported before; skipping them")
+
+    # The whole file's effect, so a movement is the same on every attempt
+    cash = cash_effect(rows) if apply_cash else {}
+    cash = {unit: amount for unit, amount in cash.items() if abs(amount) >= 0.005}
+    moved_keys = imported_keys([cash_key(result.digest, unit) for unit in cash], batch_size, "cash_transactions")
+    cash = {unit: amount for unit, amount in cash.items() if cash_key(result.digest, unit) not in moved_keys}
+    _check_funds(cash)
+
+    inserted = 0
+    records: List[dict] = rows[~rows["idempotency_key"].isin(stored)].to_dict("records")
+    try:
+        for start in range(0, len(records), batch_size):
+            batch = records[start:start + batch_size]
+            retried(lambda: repository.upsert("inventory", batch, on_conflict="idempotency_key"),
+                    batch[0]["idempotency_key"])
+            inserted += len(batch)
+    except Exception:
+        logger.error(f"Import of {filename} stopped after {inserted} of {len(records)} rows; "
+                     f"no cash was moved, import the file again to complete it")
+        raise
+
+    moved = {}
+    for unit, amount in cash.items():
+        count = int((rows["business_unit"] == unit).sum())
+        applied, _ = adjust_cash_balance(abs(amount), unit, "add" if amount > 0 else "subtract",
+                                         f"Import {filename}: {count} transactions", cash_key(result.digest, unit))
+        if not applied:
+            logger.error(f"Import of {filename}: {unit} cash of AED {amount:,.2f} was refused after the rows were stored")
+            raise ValueError(f"Insufficient funds in {unit} for net purchases of AED {-amount:,.2f}. "
+                             f"The transactions were stored; import the file again once funds are available "
+                             f"to record their cash")
+        moved[unit] = amount
+    logger.info(f"Imported {inserted} inventory transactions from {filename}")
+    result.inserted, result.skipped, result.cash = inserted, len(stored), moved
+    return result
@@ -0,0 +1,82 @@
+"""
+Process-wide TTL cache for repository reads.
+
+Shared by every session of the running app. Entries expire after CACHE_TTL
+seconds and the least recently used ones are evicted beyond
+CACHE_MAX_ENTRIES. Every write through the repository invalidates the
+entries that read the written table, so our own writes are never masked;
+changes made outside the app show up within the TTL.
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+CACHE_TTL = float(os.getenv("BIZMASTER_CACHE_TTL", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("BIZMASTER_CACHE_ENTRIES", "256"))
+
+# Sentinel returned by TTLCache.get on a miss (an empty result is a valid hit)
+MISS = object()
+
+class TTLCache:
+    """Thread-safe LRU with per-entry expiry, indexed by the tables each entry reads"""
+
+    def __init__(self, ttl: float = CACHE_TTL, max_entries: int = CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[Hashable, Tuple[float, Tuple[str, ...], List[Dict[str, Any]]]]" = OrderedDict()
+        self.generations: Dict[str, int] = {}
+        self.epoch = 0
+        self.counters = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    def generation(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        """Write generation of each table; taken before a load and checked on put"""
+        with self.lock:
+            return self._generation(tables)
+
+    def _generation(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        return (self.epoch,) + tuple(self.generations.get(table, 0) for table in tables)
+
+    def get(self, key: Hashable) -> Any:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.counters["misses"] += 1
+                return MISS
+            self.entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return entry[2]
+
+    def put(self, key: Hashable, rows: List[Dict[str, Any]], tables: Tuple[str, ...],
+            generation: Tuple[int, ...], ttl: Optional[float] = None) -> None:
+        """Store rows unless one of their tables was written while they were loading (ttl overrides the default)"""
+        with self.lock:
+            if self._generation(tables) != generation:
+                return
+            self.entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), tables, rows)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def invalidate(self, table: str) -> None:
+        """Drop every entry that read table"""
+        with self.lock:
+            self.generations[table] = self.generations.get(table, 0) + 1
+            stale = [key for key, entry in self.entries.items() if table in entry[1]]
+            for key in stale:
+                del self.entries[key]
+            self.counters["invalidations"] += len(stale)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.epoch += 1
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counters, entries=len(self.entries))
@@ -0,0 +1,114 @@
+"""
+Cash balance movements and the cash ledger.
+
+cash_transactions is the append-only source of truth. Every deposit and
+withdrawal goes through adjust_cash_balance, which calls the
+adjust_cash_balance database function (data/supabase_functions.sql): the
+balance check, the update and the ledger entry happen in one transaction and
+one round trip. Balances are checkpointed in cash_checkpoints, so any
+balance is a checkpoint plus the sum of the movements after it.
+"""
+import logging
+from datetime import datetime
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.repository import Query, get_repository
+from data.idempotency import retried
+from data.projections import LedgerView, CheckpointView, column_list
+from data.queries import fetch_frame
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def adjust_cash_balance(amount: float, business_unit: str, action: str, description: str = "",
+                        idempotency_key: Optional[str] = None) -> Tuple[bool, float]:
+    """
+    Atomically add to or subtract from a business unit's cash balance.
+
+    Args:
+        amount (float): Positive amount to move
+        business_unit (str): Target business unit
+        action (str): 'add' or 'subtract'
+        description (str): Note stored with the ledger entry
+        idempotency_key (str): Submission key; a movement already recorded
+            under it is not repeated and its balance is returned
+
+    Returns:
+        tuple: (applied: bool, balance: float) - applied is False when a
+        withdrawal exceeds the balance, which is then left unchanged
+
+    Raises:
+        ValueError: If the amount is not positive or the action is unknown
+    """
+    amount = float(amount)
+    if amount <= 0:
+        raise ValueError("Amount must be positive")
+    if action not in ('add', 'subtract'):
+        raise ValueError("Invalid action. Use 'add' or 'subtract'.")
+
+    rows = retried(lambda: get_repository().rpc("adjust_cash_balance", {
+        "p_business_unit": business_unit,
+        "p_amount": amount,
+        "p_action": action,
+        "p_description": description or None,
+        "p_idempotency_key": idempotency_key
+    }), idempotency_key)
+    result = rows[0]
+    balance = float(result["balance"] or 0.0)
+    if result["applied"]:
+        logger.info(f"{business_unit} cash {action} {amount:,.2f}; balance {balance:,.2f}")
+    return bool(result["applied"]), balance
+
+def open_cash_balance(business_unit: str, balance: float) -> float:
+    """Set a unit's balance outright (initial balance or reset) with an opening checkpoint"""
+    get_repository().rpc("open_cash_balance", {"p_business_unit": business_unit, "p_balance": float(balance)})
+    logger.info(f"{business_unit} cash opened at {float(balance):,.2f}")
+    return float(balance)
+
+def cash_balance_at(business_unit: str, at: Optional[datetime] = None) -> float:
+    """Balance of a unit at a point in time (UTC, now by default): checkpoint plus later movements"""
+    rows = get_repository().rpc("cash_balance_at", {"p_business_unit": business_unit, "p_at": at})
+    return float(rows[0]["balance"] or 0.0) if rows else 0.0
+
+def cash_balance_history(business_unit: str) -> pd.DataFrame:
+    """
+    Every ledger entry of a unit with the balance after it.
+
+    Rebuilt with one cumulative sum: each entry's balance is the balance of
+    the latest checkpoint before it plus the movements since that checkpoint.
+
+    Returns:
+        DataFrame: LedgerView columns plus balance, oldest first
+    """
+    ledger = fetch_frame(Query("cash_transactions").eq("business_unit", business_unit), LedgerView)
+    if ledger.empty:
+        return pd.DataFrame(columns=column_list(LedgerView) + ['balance'])
+    checkpoints = fetch_frame(
+        Query("cash_checkpoints").eq("business_unit", business_unit), CheckpointView
+    ).sort_values(['transaction_id', 'id'])
+
+    ids = ledger['id'].to_numpy()
+    delta = np.where(ledger['action'].to_numpy() == 'subtract', -1.0, 1.0) * ledger['amount'].to_numpy()
+    running = np.cumsum(delta)
+
+    history = ledger.copy()
+    history['balance'] = running
+    if checkpoints.empty:
+        return history
+
+    # Running total at each checkpoint's transaction, and the checkpoint governing each entry
+    checkpoint_ids = checkpoints['transaction_id'].to_numpy()
+    base_position = np.searchsorted(ids, checkpoint_ids, side='right') - 1
+    running_at_checkpoint = np.where(base_position >= 0, running[np.maximum(base_position, 0)], 0.0)
+    governing = np.searchsorted(checkpoint_ids, ids, side='left') - 1
+
+    covered = governing >= 0
+    index = governing[covered]
+    history.loc[covered, 'balance'] = (
+        checkpoints['balance'].to_numpy()[index] + running[covered] - running_at_checkpoint[index]
+    )
+    return history
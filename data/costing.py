@@ -0,0 +1,249 @@
+"""
+Lot costing of inventory: cost of goods sold, remaining lots and gross margin.
+
+A LotLedger takes one business unit's purchases and sales in date order and
+costs each sale either FIFO (oldest lots first) or at the moving weighted
+average cost. State is held in NumPy arrays. The quantity consumed by sales
+is the running quantity sold capped at what had been bought by then (a
+cumulative minimum). FIFO cost is read off the cumulative lot-cost curve
+with searchsorted, so a batch is costed without a per-row Python loop; the
+weighted average needs one pass over the purchases only.
+
+Transactions dated after everything already costed are appended
+incrementally. A back-dated transaction raises OutOfOrderError, and
+ledger_for rebuilds the ledger from the shared inventory snapshot.
+
+Sales beyond the stock on hand are costed at the latest purchase cost and
+reported as uncovered_kg; they never create negative lots.
+"""
+import os
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data.shared_tables import shared_tables
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+METHODS = {"fifo": "FIFO", "wavg": "Weighted average"}
+COSTING_METHOD = os.getenv("BIZMASTER_COSTING_METHOD", "fifo")
+
+SALE_COLUMNS = ["id", "date", "quantity_kg", "revenue", "cogs", "uncovered_kg"]
+
+class OutOfOrderError(ValueError):
+    """A transaction is dated before transactions the ledger has already costed"""
+
+def _forward_fill(values: np.ndarray, present: np.ndarray, initial: float) -> np.ndarray:
+    """Each position's latest present value (initial before the first)"""
+    index = np.maximum.accumulate(np.where(present, np.arange(len(values)), -1))
+    return np.where(index >= 0, values[np.maximum(index, 0)], initial)
+
+class LotLedger:
+    """Purchase lots and costed sales of one business unit"""
+
+    def __init__(self, method: str = COSTING_METHOD):
+        if method not in METHODS:
+            raise ValueError(f"Unknown costing method: {method}")
+        self.method = method
+        # Purchase lots, with cumulative quantity and cost curves starting at 0
+        self.lot_dates = np.empty(0, dtype="datetime64[ns]")
+        self.lot_kg = np.empty(0)
+        self.lot_costs = np.empty(0)
+        self.cum_kg = np.zeros(1)
+        self.cum_cost = np.zeros(1)
+        # Position on cum_kg consumed by sales, total sold, and the running
+        # minimum of purchased - sold (0 or the largest shortfall so far)
+        self.consumed = 0.0
+        self.sold = 0.0
+        self.slack = 0.0
+        self.avg_cost = 0.0
+        self.last_cost = 0.0
+        self.last_key: Optional[Tuple[np.datetime64, int]] = None
+        self.max_id = 0
+        self.sales = {name: np.empty(0) for name in SALE_COLUMNS}
+        self.sales["date"] = np.empty(0, dtype="datetime64[ns]")
+
+    def _curve(self, position: np.ndarray) -> np.ndarray:
+        """FIFO cost of the first position kg ever purchased"""
+        if len(self.lot_kg) == 0:
+            return np.zeros_like(position)
+        lot = np.clip(np.searchsorted(self.cum_kg, position, side="right") - 1, 0, len(self.lot_kg) - 1)
+        unit_cost = self.lot_costs[lot] / np.where(self.lot_kg[lot] > 0, self.lot_kg[lot], 1.0)
+        return self.cum_cost[lot] + (position - self.cum_kg[lot]) * unit_cost
+
+    def append(self, transactions: pd.DataFrame) -> None:
+        """
+        Cost a batch of transactions dated at or after everything already costed.
+
+        Args:
+            transactions (DataFrame): id, date, transaction_type, quantity_kg and
+                total_amount; rows other than purchases and sales are ignored
+
+        Raises:
+            OutOfOrderError: If the batch starts before the last costed transaction
+        """
+        batch = transactions[transactions['transaction_type'].isin(['Purchase', 'Sale'])]
+        batch = batch.sort_values(['date', 'id'], kind='stable')
+        self.append_arrays(
+            pd.to_datetime(batch['date']).to_numpy(dtype="datetime64[ns]"),
+            batch['id'].to_numpy(dtype=np.int64),
+            (batch['transaction_type'] == 'Purchase').to_numpy(),
+            batch['quantity_kg'].to_numpy(dtype=float),
+            batch['total_amount'].to_numpy(dtype=float),
+        )
+
+    def append_arrays(self, dates: np.ndarray, ids: np.ndarray, is_purchase: np.ndarray,
+                      kg: np.ndarray, amount: np.ndarray) -> None:
+        """append() for purchases and sales already sorted by (date, id), as arrays"""
+        if len(dates) == 0:
+            return
+        if self.last_key is not None and (dates[0], ids[0]) <= self.last_key:
+            raise OutOfOrderError(f"Transaction {ids[0]} is dated before costed transactions")
+
+        purchased_kg = np.where(is_purchase, kg, 0.0)
+        sold_kg = np.where(is_purchase, 0.0, kg)
+
+        # Consumption: sold so far, capped at purchased so far
+        purchased = self.cum_kg[-1] + np.cumsum(purchased_kg)
+        sold = self.sold + np.cumsum(sold_kg)
+        slack = np.minimum(self.slack, np.minimum.accumulate(purchased - sold))
+        consumed = sold + slack
+        consumed_before = np.concatenate(([self.consumed], consumed[:-1]))
+        covered = consumed - consumed_before
+        uncovered = np.where(is_purchase, 0.0, np.maximum(sold_kg - covered, 0.0))
+
+        unit_costs = np.where(is_purchase & (kg > 0), amount / np.where(kg > 0, kg, 1.0), 0.0)
+        last_cost = _forward_fill(unit_costs, is_purchase, self.last_cost)
+
+        # New lots
+        self.lot_dates = np.concatenate((self.lot_dates, dates[is_purchase]))
+        self.lot_kg = np.concatenate((self.lot_kg, kg[is_purchase]))
+        self.lot_costs = np.concatenate((self.lot_costs, amount[is_purchase]))
+        self.cum_kg = np.concatenate((self.cum_kg, self.cum_kg[-1] + np.cumsum(kg[is_purchase])))
+        self.cum_cost = np.concatenate((self.cum_cost, self.cum_cost[-1] + np.cumsum(amount[is_purchase])))
+
+        if self.method == "fifo":
+            cogs = self._curve(consumed) - self._curve(consumed_before) + uncovered * last_cost
+        else:
+            # Moving average: updated at each purchase from the stock left before it
+            averages = np.empty(len(dates))
+            average = self.avg_cost
+            for position in np.flatnonzero(is_purchase):
+                stock = max(purchased[position] - purchased_kg[position] - consumed_before[position], 0.0)
+                total = stock + kg[position]
+                average = (average * stock + amount[position]) / total if total > 0 else average
+                averages[position] = average
+            average_at = _forward_fill(averages, is_purchase, self.avg_cost)
+            cogs = sold_kg * average_at
+            self.avg_cost = average
+
+        sales = ~is_purchase
+        for name, values in (("id", ids), ("date", dates), ("quantity_kg", sold_kg), ("revenue", amount),
+                             ("cogs", cogs), ("uncovered_kg", uncovered)):
+            self.sales[name] = np.concatenate((self.sales[name], values[sales]))
+
+        self.consumed, self.sold, self.slack = consumed[-1], sold[-1], slack[-1]
+        self.last_cost = last_cost[-1]
+        self.last_key = (dates[-1], ids[-1])
+        self.max_id = max(self.max_id, int(ids.max()))
+
+    def open_lots(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(dates, remaining kg, unit cost) of the lots not yet sold, oldest first"""
+        # Lots before the consumed position are sold out; only the tail is scanned
+        first = max(int(np.searchsorted(self.cum_kg, self.consumed, side="right")) - 1, 0)
+        left = self.cum_kg[first + 1:] - np.maximum(self.cum_kg[first:-1], self.consumed)
+        open_lots = left > 1e-9
+        if self.method == "wavg":
+            unit_cost = np.full(len(left), self.avg_cost)
+        else:
+            unit_cost = self.lot_costs[first:] / np.where(self.lot_kg[first:] > 0, self.lot_kg[first:], 1.0)
+        return self.lot_dates[first:][open_lots], left[open_lots], unit_cost[open_lots]
+
+    def remaining_lots(self) -> pd.DataFrame:
+        """Lots not yet sold, oldest first, valued at lot cost (FIFO) or the moving average"""
+        dates, remaining_kg, unit_cost = self.open_lots()
+        lots = pd.DataFrame({"date": dates, "remaining_kg": remaining_kg, "unit_cost": unit_cost})
+        lots["value"] = lots["remaining_kg"] * lots["unit_cost"]
+        return lots
+
+    def stock(self) -> Tuple[float, float]:
+        """(kg on hand, value on hand)"""
+        kg = float(self.cum_kg[-1] - self.consumed)
+        if self.method == "wavg":
+            return kg, float(kg * self.avg_cost)
+        return kg, float(self._curve(np.array([self.cum_kg[-1]]))[0] - self._curve(np.array([self.consumed]))[0])
+
+    def sales_frame(self) -> pd.DataFrame:
+        """Every costed sale with its COGS and gross margin"""
+        sales = pd.DataFrame(self.sales, columns=SALE_COLUMNS)
+        sales["gross_margin"] = sales["revenue"] - sales["cogs"]
+        return sales
+
+    def margins(self, freq: str = "M") -> pd.DataFrame:
+        """Sold kg, revenue, COGS and gross margin per period (pandas period alias)"""
+        sales = self.sales_frame()
+        periods = sales.groupby(sales["date"].dt.to_period(freq))[
+            ["quantity_kg", "revenue", "cogs", "gross_margin", "uncovered_kg"]
+        ].sum()
+        periods["margin_pct"] = (periods["gross_margin"] / periods["revenue"].where(periods["revenue"] != 0) * 100).fillna(0.0)
+        periods.index = periods.index.astype(str)
+        periods.index.name = "period"
+        return periods
+
+    def summary(self) -> Dict[str, float]:
+        """Totals of sales, COGS and gross margin, with the stock on hand"""
+        stock_kg, stock_value = self.stock()
+        revenue, cogs = float(self.sales["revenue"].sum()), float(self.sales["cogs"].sum())
+        return {
+            "sold_kg": float(self.sales["quantity_kg"].sum()),
+            "revenue": revenue,
+            "cogs": cogs,
+            "gross_margin": revenue - cogs,
+            "stock_kg": stock_kg,
+            "stock_value": stock_value,
+            "uncovered_kg": float(self.sales["uncovered_kg"].sum()),
+        }
+
+def build_ledger(transactions: pd.DataFrame, method: str = COSTING_METHOD) -> LotLedger:
+    """Cost a complete transaction history from scratch"""
+    ledger = LotLedger(method)
+    ledger.append(transactions)
+    return ledger
+
+@st.cache_resource
+def _ledgers() -> Tuple[threading.Lock, Dict[Tuple[str, str], Tuple[object, LotLedger]]]:
+    return threading.Lock(), {}
+
+def ledger_for(business_unit: str, method: str = COSTING_METHOD) -> LotLedger:
+    """
+    The process-wide ledger of a unit, brought up to date with the shared inventory snapshot.
+
+    Rows added since the last call are appended. After a full reload of the
+    snapshot, or when new rows are back-dated, the ledger is rebuilt. The
+    snapshot is only as fresh as its last sync (up to SYNC_INTERVAL old), so
+    callers that must reflect the latest rows sync it first.
+    """
+    lock, ledgers = _ledgers()
+    shared = shared_tables()
+    inventory = shared.frames.get('inventory')
+    if inventory is None:
+        return LotLedger(method)
+    rows = inventory[inventory['business_unit'] == business_unit]
+    with lock:
+        source, ledger = ledgers.get((business_unit, method), (None, None))
+        if ledger is None or source != shared.full_synced_at:
+            ledger = build_ledger(rows, method)
+        else:
+            try:
+                ledger.append(rows[rows['id'] > ledger.max_id])
+            except OutOfOrderError:
+                logger.info(f"Back-dated inventory for {business_unit}; rebuilding {METHODS[method]} ledger")
+                ledger = build_ledger(rows, method)
+        ledgers[(business_unit, method)] = (shared.full_synced_at, ledger)
+        return ledger
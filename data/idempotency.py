@@ -0,0 +1,76 @@
+"""
+Idempotent writes.
+
+Every form submission carries a client-generated idempotency key (see
+components/submission.py). The key is stored with the rows the submission
+writes, under a unique index on inventory, expenses, investments and
+cash_transactions:
+
+- record_inventory and adjust_cash_balance look the key up after taking
+  their row lock and return the earlier outcome instead of writing again;
+- plain inserts (expenses, investments) are upserts on the key.
+
+A repeated submission (double click, rerun, reconnect) is therefore a no-op,
+and a keyed write that timed out is retried with the same key without
+knowing whether the first attempt reached the database.
+"""
+import os
+import time
+import uuid
+import logging
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+from data.repository import get_repository
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WRITE_ATTEMPTS = int(os.getenv("BIZMASTER_WRITE_ATTEMPTS", "3"))
+RETRY_BACKOFF = 0.5  # seconds, multiplied by the attempt number
+
+# Timeouts and dropped connections: the write may or may not have been applied
+TRANSIENT_ERRORS = (httpx.TransportError,)
+
+T = TypeVar("T")
+
+def new_key() -> str:
+    """A fresh idempotency key"""
+    return uuid.uuid4().hex
+
+def retried(write: Callable[[], T], key: Optional[str], attempts: int = WRITE_ATTEMPTS) -> T:
+    """
+    Run a write, retrying transient errors when it is keyed.
+
+    Unkeyed writes run once: retrying them could apply them twice.
+    """
+    attempts = attempts if key else 1
+    for attempt in range(1, attempts + 1):
+        try:
+            return write()
+        except TRANSIENT_ERRORS as e:
+            if attempt == attempts:
+                raise
+            logger.warning(f"Write {key} failed ({str(e)}); retrying ({attempt}/{attempts - 1})")
+            time.sleep(RETRY_BACKOFF * attempt)
+
+def insert_once(table: str, row: Dict[str, Any], key: Optional[str]) -> Dict[str, Any]:
+    """
+    Insert a row unless one with the same idempotency key exists.
+
+    A repeated key writes the same values over the existing row, so the table
+    keeps one row per submission.
+
+    Returns:
+        dict: The row as stored
+    """
+    repository = get_repository()
+    if not key:
+        rows = repository.insert(table, row)
+    else:
+        rows = retried(
+            lambda: repository.upsert(table, dict(row, idempotency_key=key), on_conflict="idempotency_key"), key
+        )
+    return rows[0] if rows else {}
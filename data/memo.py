@@ -0,0 +1,100 @@
+"""
+Per-rerun memo for repository reads.
+
+Identical reads issued during one Streamlit script run (same table, columns,
+filters, ordering and limits, or the same rpc call) are answered from memory.
+The memo is emptied at the start of every run, including fragment-only
+reruns (see fragment), and any write drops the memoised reads of the table
+it touched, so a page always sees its own writes. Outside a script run
+(benchmarks, worker threads) reads go straight through.
+"""
+import logging
+import functools
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MEMO_KEY = "_query_memo"
+PAGE_KEY = "_query_memo_page"
+STATS_KEY = "query_memo_stats"
+
+def _active() -> bool:
+    return get_script_run_ctx(suppress_warning=True) is not None and MEMO_KEY in st.session_state
+
+def begin_run() -> None:
+    """Start an empty memo for this script run (call once at the top of the script)"""
+    st.session_state[MEMO_KEY] = {}
+    set_page("startup")
+
+def fragment_run() -> bool:
+    """True while only fragments rerun (the top of the script is skipped)"""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx is not None and bool(ctx.fragment_ids_this_run)
+
+def begin_fragment() -> None:
+    """Start an empty memo when only a fragment reruns (those runs skip begin_run)"""
+    if fragment_run() and MEMO_KEY in st.session_state:
+        st.session_state[MEMO_KEY] = {}
+
+def fragment(function: Callable) -> Callable:
+    """
+    st.fragment whose reruns read fresh data.
+
+    Interacting with a widget inside the fragment reruns only the fragment,
+    so the rest of the page is neither recomputed nor re-read. During a full
+    run the fragment shares the run's memo.
+    """
+    @functools.wraps(function)
+    def run(*args, **kwargs):
+        begin_fragment()
+        return function(*args, **kwargs)
+    return st.fragment(run)
+
+def set_page(page: str) -> None:
+    """Attribute the following reads to a page and reset its counters for this run"""
+    st.session_state[PAGE_KEY] = page
+    st.session_state.setdefault(STATS_KEY, {})[page] = {"queries": 0, "deduplicated": 0}
+
+def end_run() -> None:
+    """Log how many reads of the current page were served from the memo"""
+    if not _active():
+        return
+    page = st.session_state[PAGE_KEY]
+    counter = st.session_state[STATS_KEY][page]
+    logger.info(f"{page}: {counter['deduplicated']} of {counter['queries']} reads served from the per-run memo")
+
+def stats() -> Dict[str, Dict[str, int]]:
+    """Read and de-duplicated counts from the latest run of each page"""
+    return st.session_state.get(STATS_KEY, {})
+
+def remember(key: Hashable, load: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Return the rows memoised under key, loading them on first use in this run"""
+    if not _active():
+        return load()
+    try:
+        hash(key)
+    except TypeError:
+        return load()
+    memo = st.session_state[MEMO_KEY]
+    counter = st.session_state[STATS_KEY][st.session_state[PAGE_KEY]]
+    counter["queries"] += 1
+    if key in memo:
+        counter["deduplicated"] += 1
+    else:
+        memo[key] = load()
+    # Callers get their own list; the row dicts are shared and treated as read-only
+    return list(memo[key])
+
+def forget(table: Optional[str] = None) -> None:
+    """Drop memoised reads of a table (every table when None) and all rpc results"""
+    if not _active():
+        return
+    memo = st.session_state[MEMO_KEY]
+    for key in list(memo):
+        if table is None or key[0] == "rpc" or key[1].table == table:
+            del memo[key]
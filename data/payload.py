@@ -0,0 +1,71 @@
+"""
+Per-rerun websocket payload accounting.
+
+Counts the messages and serialized bytes Streamlit sends to the browser
+during one script run, attributed to the page being rendered, so the
+diagnostics page can show which screens are heavy. The counter wraps the
+run context's outgoing message queue once per context and costs one
+ByteSize() call per message. Outside a script run nothing is counted.
+"""
+import logging
+from typing import Dict
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STATS_KEY = "payload_stats"
+RUN_ATTRIBUTE = "_payload_run"
+
+def _install(ctx) -> None:
+    """Wrap the context's message queue so every outgoing message is counted"""
+    if hasattr(ctx, RUN_ATTRIBUTE):
+        return
+    send = ctx._enqueue
+
+    def counted(msg) -> None:
+        run = getattr(ctx, RUN_ATTRIBUTE, None)
+        if run is not None:
+            run["messages"] += 1
+            run["bytes"] += msg.ByteSize()
+        send(msg)
+
+    ctx._enqueue = counted
+
+def begin_run() -> None:
+    """Start counting this script run's payload (call once at the top of the script)"""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return
+    try:
+        _install(ctx)
+    except AttributeError as e:
+        logger.warning(f"Payload accounting unavailable: {str(e)}")
+        return
+    setattr(ctx, RUN_ATTRIBUTE, {"page": "startup", "messages": 0, "bytes": 0})
+
+def set_page(page: str) -> None:
+    """Attribute the rest of this run's payload to a page"""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    run = getattr(ctx, RUN_ATTRIBUTE, None)
+    if run is not None:
+        run["page"] = page
+
+def end_run() -> None:
+    """Record this run's payload as the latest one of its page"""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    run = getattr(ctx, RUN_ATTRIBUTE, None)
+    if run is None:
+        return
+    setattr(ctx, RUN_ATTRIBUTE, None)
+    st.session_state.setdefault(STATS_KEY, {})[run["page"]] = {
+        "messages": run["messages"], "bytes": run["bytes"]
+    }
+    logger.info(f"{run['page']}: {run['messages']} messages, {run['bytes'] / 1024:,.1f} KB sent")
+
+def stats() -> Dict[str, Dict[str, int]]:
+    """Messages and bytes sent by the latest run of each page"""
+    return st.session_state.get(STATS_KEY, {})
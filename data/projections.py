@@ -0,0 +1,174 @@
+"""
+Typed column projections for every view that reads a table.
+
+Each TypedDict lists exactly the columns a call site needs, so queries select
+those columns instead of "*". The annotations double as the expected Python
+type of each field.
+"""
+from typing import Optional, TypedDict
+
+# ----- inventory -----
+class InventoryRow(TypedDict):
+    id: int
+    date: str
+    transaction_type: str
+    quantity_kg: float
+    unit_price: float
+    total_amount: float
+    remarks: Optional[str]
+    business_unit: str
+
+class InventoryValueView(TypedDict):
+    """Quantity and price only (dashboard and report valuations)"""
+    quantity_kg: float
+    unit_price: float
+
+class StockView(TypedDict):
+    """Per-type quantities and amounts (stock, cost and revenue)"""
+    transaction_type: str
+    quantity_kg: float
+    total_amount: float
+
+class InventoryHistoryView(TypedDict):
+    """Transaction tables shown on inventory and report pages"""
+    date: str
+    transaction_type: str
+    quantity_kg: float
+    unit_price: float
+    total_amount: float
+    remarks: Optional[str]
+    business_unit: str
+
+class LotView(TypedDict):
+    """Purchases and sales in costing order (lot costing and snapshots)"""
+    id: int
+    date: str
+    transaction_type: str
+    quantity_kg: float
+    total_amount: float
+
+class UnitStockView(TypedDict):
+    """Running stock totals per unit (unit_stock index)"""
+    business_unit: str
+    purchased_kg: float
+    sold_kg: float
+    purchase_cost: float
+    sales_revenue: float
+
+class RollupView(TypedDict):
+    """Purchase and sale totals per unit and period (inventory_rollups)"""
+    business_unit: str
+    period: str
+    purchased_kg: float
+    sold_kg: float
+    purchase_cost: float
+    sales_revenue: float
+
+class SnapshotView(TypedDict):
+    """End-of-day stock and valuation of a unit (stock_snapshots)"""
+    business_unit: str
+    as_of: str
+    stock_kg: float
+    fifo_value: float
+    wavg_value: float
+    market_price: Optional[float]
+    market_value: Optional[float]
+    lots: str
+    last_id: int
+    row_count: int
+
+# ----- expenses -----
+class ExpenseRow(TypedDict):
+    id: int
+    date: str
+    category: str
+    amount: float
+    description: Optional[str]
+    business_unit: str
+    payment_method: Optional[str]
+    partner: Optional[str]
+
+class ExpenseAmountView(TypedDict):
+    """Totals only (operating expense sums)"""
+    amount: float
+
+class ExpenseHistoryView(TypedDict):
+    """Recent expenses table"""
+    date: str
+    category: str
+    amount: float
+    description: Optional[str]
+    business_unit: str
+    partner: Optional[str]
+    payment_method: Optional[str]
+
+# ----- investments -----
+class InvestmentRow(TypedDict):
+    id: int
+    business_unit: str
+    inv_date: str
+    amount: float
+    investor: Optional[str]
+    description: Optional[str]
+
+class InvestmentAmountView(TypedDict):
+    amount: float
+
+class InvestmentHistoryView(TypedDict):
+    business_unit: str
+    inv_date: str
+    amount: float
+    investor: Optional[str]
+    description: Optional[str]
+
+# ----- partnerships -----
+class PartnershipRow(TypedDict):
+    id: int
+    business_unit: str
+    partner_name: str
+    share: float
+    withdrawn: float
+    invested: float
+
+class PartnerShareView(TypedDict):
+    business_unit: str
+    partner_name: str
+    share: float
+
+class PartnerProfitView(TypedDict):
+    business_unit: str
+    partner_name: str
+    share: float
+    withdrawn: float
+
+# ----- cash and prices -----
+class CashBalanceView(TypedDict):
+    business_unit: str
+    balance: float
+
+class PriceView(TypedDict):
+    price: float
+    date: str
+
+class LedgerView(TypedDict):
+    """Cash ledger entries used to rebuild balance history"""
+    id: int
+    timestamp: str
+    amount: float
+    action: str
+    description: Optional[str]
+
+class CheckpointView(TypedDict):
+    id: int
+    transaction_id: int
+    balance: float
+    kind: str
+    as_of: str
+
+def columns(view: type) -> str:
+    """Comma-separated select list for a projection"""
+    return ", ".join(view.__annotations__)
+
+def column_list(view: type) -> list:
+    """Column names of a projection, in declaration order"""
+    return list(view.__annotations__)
@@ -0,0 +1,339 @@
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data.repository import Query, Repository, get_repository
+from data.projections import (
+    InventoryRow, ExpenseRow, InvestmentRow, PartnershipRow,
+    CashBalanceView, PriceView, UnitStockView, RollupView, columns, column_list
+)
+from data.schema import coerce
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ColumnBuffer:
+    """
+    Pre-sized numpy column arrays filled page by page.
+
+    float/int fields get typed arrays, everything else object arrays. The
+    buffer grows if more rows arrive than were counted and is trimmed when
+    fewer do, so the result is correct even if the table changes mid-read.
+    """
+
+    def __init__(self, view: type, capacity: int):
+        self.names = column_list(view)
+        self.dtypes = {
+            name: (np.float64 if kind is float else np.int64 if kind is int else object)
+            for name, kind in view.__annotations__.items()
+        }
+        self.size = 0
+        self.arrays = {name: np.empty(max(capacity, 0), dtype=self.dtypes[name]) for name in self.names}
+
+    def _grow(self, needed: int) -> None:
+        capacity = max(needed, 2 * len(self.arrays[self.names[0]]))
+        for name, array in self.arrays.items():
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            self.arrays[name] = grown
+
+    def extend(self, rows: List[Dict[str, Any]]) -> None:
+        end = self.size + len(rows)
+        if self.names and end > len(self.arrays[self.names[0]]):
+            self._grow(end)
+        for name, array in self.arrays.items():
+            values = [row.get(name) for row in rows]
+            if array.dtype == np.float64:
+                # None becomes NaN
+                array[self.size:end] = np.array(values, dtype=np.float64)
+            else:
+                array[self.size:end] = values
+        self.size = end
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame({name: array[:self.size] for name, array in self.arrays.items()}, columns=self.names)
+
+def fetch_frame(query: Query, view: type, repository: Optional[Repository] = None,
+                counted: bool = True) -> pd.DataFrame:
+    """
+    Run a projected query and return a DataFrame with the view's columns.
+
+    Rows are counted first, then streamed page by page (keyset on id) into
+    a ColumnBuffer, so reads are never truncated at the server row cap and
+    only one page of row dicts is held at a time. The frame is coerced to
+    the table's dtypes (data/schema.py). Reads go through repository, or
+    the shared one when None. counted=False skips the count round trip and
+    lets the buffer grow instead (for reads that are usually small).
+    """
+    repository = repository or get_repository()
+    query = query.select(columns(view))
+    expected = max(repository.count(query) - (query.offset_rows or 0), 0) if counted else 0
+    if query.limit_rows is not None:
+        expected = min(expected, query.limit_rows)
+    buffer = ColumnBuffer(view, expected)
+    for page in repository.pages(query):
+        buffer.extend(page)
+    return coerce(buffer.frame(), query.table)
+
+def _fetch_unit_table(table: str, label: str, view: type, business_unit: Optional[str]) -> pd.DataFrame:
+    try:
+        query = Query(table)
+        if business_unit:
+            query = query.eq("business_unit", business_unit)
+        return fetch_frame(query, view)
+    except Exception as e:
+        logger.error(f"Failed to load {label}: {str(e)}")
+        st.error(f"Failed to load {label}: {str(e)}")
+        return pd.DataFrame(columns=column_list(view))
+
+HISTORY_PAGE_SIZE = 10
+Cursor = Tuple[Any, int]
+
+def fetch_history_page(query: Query, view: type, cursor: Optional[Cursor] = None,
+                       page_size: int = HISTORY_PAGE_SIZE) -> Tuple[pd.DataFrame, Optional[Cursor]]:
+    """
+    Fetch one page of a table's rows, newest first, and the cursor of the next page.
+
+    Keyset paging on (date, id) descending: the page after a cursor is the
+    rest of the cursor's date (id below the cursor) followed by earlier dates,
+    each an ordered, limited read on the (business_unit, date) index. Page
+    cost does not depend on table size or on how many pages came before.
+
+    Args:
+        query (Query): Table and filters, e.g. Query("inventory").eq("business_unit", unit)
+        view (type): Projection of the columns to return
+        cursor (tuple): (date, id) of the previous page's last row, None for the first page
+        page_size (int): Rows per page
+
+    Returns:
+        tuple: (DataFrame of the view's columns, next cursor or None on the last page)
+    """
+    repository = get_repository()
+    names = column_list(view)
+    selected = names + [c for c in ("date", "id") if c not in names]
+    query = query.select(", ".join(selected))
+    wanted = page_size + 1
+    rows = []
+    if cursor is not None:
+        cursor_date, cursor_id = cursor
+        rows = repository.fetch(query.eq("date", cursor_date).lt("id", cursor_id).order("id", desc=True).limit(wanted))
+        query = query.lt("date", cursor_date)
+    if len(rows) < wanted:
+        rows += repository.fetch(query.order("date", desc=True).order("id", desc=True).limit(wanted - len(rows)))
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = (rows[-1]["date"], rows[-1]["id"]) if more else None
+    return coerce(pd.DataFrame(rows, columns=selected), query.table)[names], next_cursor
+
+def fetch_inventory(business_unit: Optional[str] = None, view: type = InventoryRow) -> pd.DataFrame:
+    """Fetch the inventory columns declared by view, optionally for one unit"""
+    return _fetch_unit_table("inventory", "inventory", view, business_unit)
+
+def fetch_expenses(business_unit: Optional[str] = None, view: type = ExpenseRow) -> pd.DataFrame:
+    """Fetch the expense columns declared by view, optionally for one unit"""
+    return _fetch_unit_table("expenses", "expenses", view, business_unit)
+
+def fetch_investments(business_unit: Optional[str] = None, view: type = InvestmentRow) -> pd.DataFrame:
+    """Fetch the investment columns declared by view, optionally for one unit"""
+    return _fetch_unit_table("investments", "investments", view, business_unit)
+
+def fetch_partnerships(business_unit: Optional[str] = None, view: type = PartnershipRow) -> pd.DataFrame:
+    """Fetch the partnership columns declared by view, optionally for one unit"""
+    return _fetch_unit_table("partnerships", "partnerships", view, business_unit)
+
+def fetch_cash_balances() -> Dict[str, float]:
+    """Fetch cash balances keyed by business unit"""
+    try:
+        rows = get_repository().fetch(Query("cash_balances", columns(CashBalanceView)))
+        return {row['business_unit']: float(row['balance']) for row in rows}
+    except Exception as e:
+        logger.error(f"Failed to load cash balances: {str(e)}")
+        st.error(f"Failed to load cash balances: {str(e)}")
+        return {}
+
+# Shown until the first market price is recorded
+DEFAULT_MARKET_PRICE = 50.0
+
+def fetch_latest_market_price() -> Tuple[float, datetime]:
+    """Get the most recent market price"""
+    try:
+        rows = get_repository().fetch(
+            Query("market_prices", columns(PriceView)).order("date", desc=True).limit(1)
+        )
+        if rows:
+            return float(rows[0]['price']), datetime.fromisoformat(rows[0]['date'])
+    except Exception as e:
+        st.error(f"Failed to load market price: {str(e)}")
+    return DEFAULT_MARKET_PRICE, datetime.now()  # Fallback values
+
+def fetch_price_history(limit: int = 30) -> pd.DataFrame:
+    """Get the most recent market prices"""
+    try:
+        return fetch_frame(Query("market_prices").order("date", desc=True).limit(limit), PriceView)
+    except Exception as e:
+        st.error(f"Failed to load price history: {str(e)}")
+        return pd.DataFrame(columns=column_list(PriceView))
+
+# KPI totals computed by the database (unit_kpis in data/supabase_functions.sql)
+KPI_COLUMNS = ['business_unit', 'purchased_kg', 'sold_kg', 'purchase_cost', 'sales_revenue', 'operating_expenses']
+
+def fetch_unit_kpis(business_unit: Optional[str] = None, start: Optional[date] = None,
+                    end: Optional[date] = None) -> pd.DataFrame:
+    """
+    Fetch per-unit stock, cost, revenue and expense totals in one aggregate call.
+
+    Adds derived columns: stock_kg (purchased - sold), avg_cost (purchase cost
+    per kg) and inventory_value (stock valued at average purchase cost).
+    """
+    try:
+        rows = get_repository().rpc("unit_kpis", {
+            "p_business_unit": business_unit, "p_start": start, "p_end": end
+        })
+        kpis = pd.DataFrame(rows, columns=KPI_COLUMNS)
+    except Exception as e:
+        logger.error(f"Failed to load KPIs: {str(e)}")
+        st.error(f"Failed to load KPIs: {str(e)}")
+        kpis = pd.DataFrame(columns=KPI_COLUMNS)
+    numeric = KPI_COLUMNS[1:]
+    kpis[numeric] = kpis[numeric].astype(float)
+    return _with_stock_columns(kpis)
+
+def _with_stock_columns(totals: pd.DataFrame) -> pd.DataFrame:
+    """Add stock_kg, avg_cost and inventory_value to per-unit purchase/sale totals"""
+    totals['stock_kg'] = totals['purchased_kg'] - totals['sold_kg']
+    totals['avg_cost'] = (totals['purchase_cost'] / totals['purchased_kg'].where(totals['purchased_kg'] > 0)).fillna(0.0)
+    totals['inventory_value'] = totals['stock_kg'] * totals['avg_cost']
+    return totals
+
+def fetch_unit_stock(business_unit: Optional[str] = None) -> pd.DataFrame:
+    """
+    All-time stock totals per unit from the unit_stock index.
+
+    The index is kept current by a database trigger on inventory, so this is
+    a lookup of one row per unit however long the history. Adds the same
+    derived columns as fetch_unit_kpis.
+    """
+    try:
+        query = Query("unit_stock", columns(UnitStockView))
+        if business_unit:
+            query = query.eq("business_unit", business_unit)
+        # No id column: pages (if ever more than one) are ordered by unit, see KEY_COLUMNS
+        stock = coerce(pd.DataFrame(get_repository().fetch(query), columns=column_list(UnitStockView)), "unit_stock")
+    except Exception as e:
+        logger.error(f"Failed to load stock index: {str(e)}")
+        st.error(f"Failed to load stock index: {str(e)}")
+        stock = pd.DataFrame(columns=column_list(UnitStockView))
+    numeric = column_list(UnitStockView)[1:]
+    stock[numeric] = stock[numeric].astype(float)
+    return _with_stock_columns(stock)
+
+# Per-unit dashboard figures (dashboard_snapshot in data/supabase_functions.sql)
+DASHBOARD_COLUMNS = ['business_unit', 'cash_balance'] + KPI_COLUMNS[1:]
+
+def fetch_dashboard_snapshot(price_history: int = 30) -> Dict[str, Any]:
+    """
+    Everything the dashboard shows, in one round trip.
+
+    Stock totals come from the unit_stock index and the whole payload is
+    cached for a few seconds (RPC_TTLS), so the cost does not grow with the
+    number of units or transactions.
+
+    Returns:
+        dict: units (cash_balance plus the fetch_unit_kpis columns, one row
+        per unit), price and price_updated (latest market price, or the
+        default) and price_history (newest first)
+    """
+    try:
+        rows = get_repository().rpc("dashboard_snapshot", {"p_price_history": price_history})
+        payload = rows[0]["payload"] if rows else {}
+    except Exception as e:
+        logger.error(f"Failed to load dashboard: {str(e)}")
+        st.error(f"Failed to load dashboard: {str(e)}")
+        payload = {}
+    units = pd.DataFrame(payload.get("units") or [], columns=DASHBOARD_COLUMNS)
+    numeric = DASHBOARD_COLUMNS[1:]
+    units[numeric] = units[numeric].astype(float)
+    prices = coerce(pd.DataFrame(payload.get("prices") or [], columns=column_list(PriceView)), "market_prices")
+    if prices.empty:
+        price, updated = DEFAULT_MARKET_PRICE, datetime.now()
+    else:
+        price, updated = float(prices['price'].iloc[0]), prices['date'].iloc[0].to_pydatetime()
+    return {
+        "units": _with_stock_columns(units),
+        "price": price,
+        "price_updated": updated,
+        "price_history": prices,
+    }
+
+# Most points a movement chart is drawn with
+MAX_CHART_POINTS = 365
+
+def fetch_inventory_rollups(business_unit: Optional[str] = None, grain: str = "day") -> pd.DataFrame:
+    """
+    Purchase and sale totals per unit and period from the inventory_rollups table.
+
+    A database trigger on inventory keeps the daily and monthly rows current,
+    so this reads one row per unit and period, oldest first.
+    """
+    try:
+        query = Query("inventory_rollups", columns(RollupView)).eq("grain", grain).order("period")
+        if business_unit:
+            query = query.eq("business_unit", business_unit)
+        # No id column: pages are ordered by period, then unit and grain (KEY_COLUMNS)
+        rollups = coerce(pd.DataFrame(get_repository().fetch(query), columns=column_list(RollupView)), "inventory_rollups")
+    except Exception as e:
+        logger.error(f"Failed to load inventory rollups: {str(e)}")
+        st.error(f"Failed to load inventory rollups: {str(e)}")
+        rollups = pd.DataFrame(columns=column_list(RollupView))
+    numeric = column_list(RollupView)[2:]
+    rollups[numeric] = rollups[numeric].astype(float)
+    return rollups
+
+def downsample(movement: pd.DataFrame, max_points: int = MAX_CHART_POINTS) -> pd.DataFrame:
+    """
+    Merge consecutive periods into at most max_points buckets.
+
+    Net movements are summed and the stock level is the one at the end of
+    each bucket, so the last point still shows the current stock.
+    """
+    if len(movement) <= max_points:
+        return movement
+    size = -(-len(movement) // max_points)
+    buckets = np.arange(len(movement)) // size
+    return movement.groupby(buckets).agg(
+        period=('period', 'last'), net_kg=('net_kg', 'sum'), net_amount=('net_amount', 'sum'), stock_kg=('stock_kg', 'last')
+    ).reset_index(drop=True)
+
+def fetch_stock_movement(business_unit: Optional[str] = None, max_points: int = MAX_CHART_POINTS) -> pd.DataFrame:
+    """
+    Stock level over time for a unit (all units when None), for charts.
+
+    Reads daily rollups, or monthly ones when there are more days than
+    max_points, and downsamples whatever is still longer.
+
+    Returns:
+        DataFrame: period (datetime), net_kg (purchased - sold), net_amount
+        (purchase cost - sales revenue) and stock_kg (running net_kg)
+    """
+    query = Query("inventory_rollups").eq("grain", "day")
+    if business_unit:
+        query = query.eq("business_unit", business_unit)
+    try:
+        grain = "day" if get_repository().count(query) <= max_points else "month"
+    except Exception as e:
+        logger.error(f"Failed to count inventory rollups: {str(e)}")
+        grain = "month"
+    rollups = fetch_inventory_rollups(business_unit, grain)
+    totals = rollups.groupby('period', sort=True)[['purchased_kg', 'sold_kg', 'purchase_cost', 'sales_revenue']].sum()
+    movement = pd.DataFrame({
+        'period': pd.to_datetime(totals.index, format="ISO8601"),
+        'net_kg': (totals['purchased_kg'] - totals['sold_kg']).to_numpy(),
+        'net_amount': (totals['purchase_cost'] - totals['sales_revenue']).to_numpy(),
+    })
+    movement['stock_kg'] = movement['net_kg'].cumsum()
+    return downsample(movement, max_points)
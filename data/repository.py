@@ -0,0 +1,787 @@
+import os
+import re
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, replace
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import streamlit as st
+from data import memo
+from data.cache import MISS, TTLCache
+from data.client import get_supabase
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Backend selection: "supabase" (hosted) or "sqlite" (local stand-in)
+BACKEND = os.getenv("BIZMASTER_BACKEND", "supabase").lower()
+SQLITE_PATH = os.getenv(
+    "BIZMASTER_SQLITE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bizmaster_users.db")
+)
+SQLITE_SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sqlite_schema.sql")
+
+# Rows per request when paging; must not exceed the PostgREST max-rows setting
+PAGE_SIZE = int(os.getenv("BIZMASTER_PAGE_SIZE", "1000"))
+
+# Upsert conflict targets for tables whose natural key is not "id"
+CONFLICT_KEYS = {
+    "cash_balances": "business_unit",
+    "users": "username",
+}
+
+# Tables without an id column and the columns that identify their rows; reads
+# of these page by offset in key order instead of by id
+KEY_COLUMNS = {
+    "unit_stock": ("business_unit",),
+    "inventory_rollups": ("business_unit", "grain", "period"),
+}
+
+# Tables whose reads are shared across sessions by CachedRepository
+CACHED_TABLES = {"inventory", "expenses", "investments", "partnerships", "market_prices", "cash_balances", "unit_stock",
+                 "inventory_rollups", "stock_snapshots"}
+
+# Tables read by each server-side function, for cache invalidation
+RPC_TABLES = {
+    "unit_kpis": ("inventory", "expenses"),
+    "cash_balance_at": ("cash_transactions", "cash_checkpoints"),
+    "dashboard_snapshot": ("cash_balances", "unit_stock", "expenses", "market_prices"),
+}
+
+# Functions cached for less than the default TTL: the dashboard also reflects
+# changes made outside the app (other instances, the SQL editor) within seconds
+RPC_TTLS = {
+    "dashboard_snapshot": float(os.getenv("BIZMASTER_DASHBOARD_TTL", "30")),
+}
+
+# Server-side functions that write, and the tables they write
+RPC_WRITES = {
+    "adjust_cash_balance": ("cash_balances", "cash_transactions", "cash_checkpoints"),
+    "open_cash_balance": ("cash_balances", "cash_checkpoints"),
+    "record_inventory": ("inventory", "unit_stock", "inventory_rollups"),
+}
+
+# Tables kept up to date by database triggers on writes to another table
+TRIGGER_WRITES = {
+    "inventory": ("unit_stock", "inventory_rollups"),
+}
+
+# Columns added to tables after their first release; local databases created
+# before then get them on open (CREATE TABLE IF NOT EXISTS leaves old tables as they are)
+ADDED_COLUMNS = {
+    "inventory": {"idempotency_key": "TEXT"},
+    "expenses": {"idempotency_key": "TEXT"},
+    "investments": {"idempotency_key": "TEXT"},
+    "cash_transactions": {"idempotency_key": "TEXT"},
+}
+
+# Ledger movements between snapshot checkpoints (matches supabase_functions.sql)
+LEDGER_CHECKPOINT_EVERY = 500
+
+Filter = Tuple[str, str, Any]
+Rows = Union[Dict[str, Any], List[Dict[str, Any]]]
+
+def written_tables(table: str) -> Tuple[str, ...]:
+    """A written table plus the tables its database triggers update"""
+    return (table,) + TRIGGER_WRITES.get(table, ())
+
+@dataclass(frozen=True)
+class Query:
+    """
+    Backend-neutral description of a table read.
+
+    Built with the same chained style as the postgrest builder, e.g.
+    Query("inventory").eq("business_unit", unit).order("date", desc=True).limit(10)
+    Instances are immutable and hashable so they can be used as cache keys.
+    """
+    table: str
+    columns: str = "*"
+    filters: Tuple[Filter, ...] = ()
+    ordering: Tuple[Tuple[str, bool], ...] = ()
+    limit_rows: Optional[int] = None
+    offset_rows: Optional[int] = None
+
+    def select(self, columns: str) -> "Query":
+        return replace(self, columns=columns)
+
+    def _filter(self, column: str, op: str, value: Any) -> "Query":
+        return replace(self, filters=self.filters + ((column, op, value),))
+
+    def eq(self, column: str, value: Any) -> "Query":
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "Query":
+        return self._filter(column, "neq", value)
+
+    def lt(self, column: str, value: Any) -> "Query":
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "Query":
+        return self._filter(column, "lte", value)
+
+    def gt(self, column: str, value: Any) -> "Query":
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "Query":
+        return self._filter(column, "gte", value)
+
+    def in_(self, column: str, values) -> "Query":
+        return self._filter(column, "in", tuple(values))
+
+    def is_(self, column: str, value: Any) -> "Query":
+        return self._filter(column, "is", value)
+
+    def order(self, column: str, desc: bool = False) -> "Query":
+        return replace(self, ordering=self.ordering + ((column, desc),))
+
+    def limit(self, count: int) -> "Query":
+        return replace(self, limit_rows=count)
+
+    def offset(self, count: int) -> "Query":
+        return replace(self, offset_rows=count)
+
+    def column_names(self) -> List[str]:
+        return [c.strip() for c in self.columns.split(",") if c.strip()]
+
+class Repository(ABC):
+    """Common interface for every storage backend"""
+
+    name = "base"
+
+    @abstractmethod
+    def fetch(self, query: Query) -> List[Dict[str, Any]]:
+        """Return the rows matching a query"""
+
+    @abstractmethod
+    def count(self, query: Query) -> int:
+        """Number of rows matching the query filters (ordering and limits are ignored)"""
+
+    def pages(self, query: Query, page_size: int = PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield the rows of a query one page at a time.
+
+        Unordered reads use keyset pagination on id (each page starts after the
+        last id seen), which stays fast and consistent on very large tables.
+        Ordered or offset reads fall back to limit/offset windows with id as a
+        tie-breaker, and tables without an id (KEY_COLUMNS) always do, with
+        their key columns as tie-breakers. query.limit_rows caps the total.
+        Rows of tables with an id include "id" even when it was not selected.
+        """
+        key = KEY_COLUMNS.get(query.table)
+        names = query.column_names()
+        if key is None and "*" not in names and "id" not in names:
+            query = query.select(query.columns + ", id")
+        keyset = key is None and query.offset_rows is None and query.ordering in ((), (("id", False),))
+        if keyset:
+            query = replace(query, ordering=(("id", False),))
+        else:
+            ordered = [column for column, _ in query.ordering]
+            for column in key or ("id",):
+                if column not in ordered:
+                    query = query.order(column)
+        remaining, offset, last_id = query.limit_rows, query.offset_rows or 0, None
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            if keyset:
+                page = query if last_id is None else query.gt("id", last_id)
+                rows = self.fetch(page.limit(size))
+            else:
+                rows = self.fetch(query.limit(size).offset(offset))
+            if not rows:
+                break
+            yield rows
+            if len(rows) < size:
+                break
+            if keyset:
+                last_id = rows[-1]["id"]
+            offset += len(rows)
+            if remaining is not None:
+                remaining -= len(rows)
+
+    @abstractmethod
+    def insert(self, table: str, rows: Rows) -> List[Dict[str, Any]]:
+        """Insert one or more rows and return them as stored"""
+
+    @abstractmethod
+    def upsert(self, table: str, rows: Rows, on_conflict: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Insert rows, updating existing ones that collide on the conflict key"""
+
+    @abstractmethod
+    def update(self, query: Query, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Update the rows matched by the query filters"""
+
+    @abstractmethod
+    def delete(self, query: Query) -> List[Dict[str, Any]]:
+        """Delete the rows matched by the query filters"""
+
+    @abstractmethod
+    def rpc(self, function: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Call a server-side function (see data/supabase_functions.sql)"""
+
+class SupabaseRepository(Repository):
+    """Repository backed by the hosted Supabase (PostgREST) project"""
+
+    name = "supabase"
+
+    def __init__(self, client):
+        self.client = client
+
+    @staticmethod
+    def _apply_filters(builder, query: Query):
+        for column, op, value in query.filters:
+            if op == "in":
+                builder = builder.in_(column, list(value))
+            elif op == "is":
+                builder = builder.is_(column, "null" if value is None else value)
+            else:
+                builder = getattr(builder, op)(column, value)
+        return builder
+
+    def fetch(self, query: Query) -> List[Dict[str, Any]]:
+        # PostgREST silently truncates at max-rows, so larger reads are paged
+        if query.limit_rows is None or query.limit_rows > PAGE_SIZE:
+            names = query.column_names()
+            added_id = query.table not in KEY_COLUMNS and "*" not in names and "id" not in names
+            rows = [row for page in self.pages(query) for row in page]
+            if added_id:
+                for row in rows:
+                    del row["id"]
+            return rows
+        builder = self._apply_filters(self.client.table(query.table).select(query.columns), query)
+        for column, desc in query.ordering:
+            builder = builder.order(column, desc=desc)
+        if query.offset_rows is not None:
+            limit = query.limit_rows if query.limit_rows is not None else 1000
+            builder = builder.range(query.offset_rows, query.offset_rows + limit - 1)
+        elif query.limit_rows is not None:
+            builder = builder.limit(query.limit_rows)
+        return builder.execute().data or []
+
+    def count(self, query: Query) -> int:
+        # "*" rather than "id": not every table has an id (KEY_COLUMNS)
+        builder = self._apply_filters(
+            self.client.table(query.table).select("*", count="exact", head=True), query
+        )
+        return builder.execute().count or 0
+
+    def insert(self, table: str, rows: Rows) -> List[Dict[str, Any]]:
+        return self.client.table(table).insert(rows).execute().data or []
+
+    def upsert(self, table: str, rows: Rows, on_conflict: Optional[str] = None) -> List[Dict[str, Any]]:
+        on_conflict = on_conflict or CONFLICT_KEYS.get(table)
+        builder = self.client.table(table)
+        if on_conflict:
+            return builder.upsert(rows, on_conflict=on_conflict).execute().data or []
+        return builder.upsert(rows).execute().data or []
+
+    def update(self, query: Query, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        builder = self._apply_filters(self.client.table(query.table).update(values), query)
+        return builder.execute().data or []
+
+    def delete(self, query: Query) -> List[Dict[str, Any]]:
+        builder = self._apply_filters(self.client.table(query.table).delete(), query)
+        return builder.execute().data or []
+
+    def rpc(self, function: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        params = {k: (v.isoformat() if isinstance(v, (date, datetime)) else v) for k, v in (params or {}).items()}
+        return self.client.rpc(function, params).execute().data or []
+
+class SQLiteRepository(Repository):
+    """
+    Local SQLite stand-in with the same filter/order/limit/upsert semantics.
+
+    Used for offline development, benchmarks and load tests. One connection
+    is shared by all threads and serialised with a lock.
+    """
+
+    name = "sqlite"
+
+    _IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+    _OPERATORS = {"eq": "=", "neq": "!=", "lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._add_columns()
+        with open(SQLITE_SCHEMA_PATH) as schema:
+            self.conn.executescript(schema.read())
+
+    def _add_columns(self) -> None:
+        """Bring tables of an existing database up to ADDED_COLUMNS before the schema indexes them"""
+        with self.conn:
+            for table, added in ADDED_COLUMNS.items():
+                existing = {row["name"] for row in self.conn.execute(f"PRAGMA table_info({self._ident(table)})")}
+                for column, declaration in added.items():
+                    if existing and column not in existing:
+                        self.conn.execute(
+                            f"ALTER TABLE {self._ident(table)} ADD COLUMN {self._ident(column)} {declaration}"
+                        )
+
+    @classmethod
+    def _ident(cls, name: str) -> str:
+        if not cls._IDENTIFIER.match(name):
+            raise ValueError(f"Invalid identifier: {name!r}")
+        return f'"{name}"'
+
+    @staticmethod
+    def _value(value: Any) -> Any:
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        return value
+
+    def _columns(self, columns: str) -> str:
+        names = [c.strip() for c in columns.split(",") if c.strip()]
+        if not names or names == ["*"]:
+            return "*"
+        return ", ".join(self._ident(c) for c in names)
+
+    def _where(self, query: Query) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        for column, op, value in query.filters:
+            column = self._ident(column)
+            if op == "in":
+                if not value:
+                    clauses.append("0")
+                    continue
+                clauses.append(f"{column} IN ({', '.join('?' for _ in value)})")
+                params.extend(self._value(v) for v in value)
+            elif op == "is":
+                clauses.append(f"{column} IS NULL" if value is None else f"{column} IS ?")
+                if value is not None:
+                    params.append(self._value(value))
+            elif op in self._OPERATORS:
+                clauses.append(f"{column} {self._OPERATORS[op]} ?")
+                params.append(self._value(value))
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def execute(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        """Run raw SQL in its own transaction and return the rows"""
+        with self.lock, self.conn:
+            return [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def fetch(self, query: Query) -> List[Dict[str, Any]]:
+        where, params = self._where(query)
+        sql = f"SELECT {self._columns(query.columns)} FROM {self._ident(query.table)}{where}"
+        if query.ordering:
+            sql += " ORDER BY " + ", ".join(
+                f"{self._ident(column)} {'DESC' if desc else 'ASC'}" for column, desc in query.ordering
+            )
+        if query.limit_rows is not None or query.offset_rows is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [query.limit_rows if query.limit_rows is not None else -1, query.offset_rows or 0]
+        return self.execute(sql, params)
+
+    def count(self, query: Query) -> int:
+        where, params = self._where(query)
+        return self.execute(f"SELECT COUNT(*) AS n FROM {self._ident(query.table)}{where}", params)[0]["n"]
+
+    def _write_rows(self, table: str, rows: Rows, conflict: Optional[str]) -> List[Dict[str, Any]]:
+        rows = [rows] if isinstance(rows, dict) else list(rows)
+        stored = []
+        with self.lock, self.conn:
+            for row in rows:
+                columns = list(row)
+                sql = (
+                    f"INSERT INTO {self._ident(table)} ({', '.join(self._ident(c) for c in columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})"
+                )
+                if conflict:
+                    # A comma-separated target names a multi-column unique index, as on_conflict does in PostgREST
+                    keys = [c.strip() for c in conflict.split(",")]
+                    updates = [c for c in columns if c not in keys]
+                    action = (
+                        "DO UPDATE SET " + ", ".join(f"{self._ident(c)} = excluded.{self._ident(c)}" for c in updates)
+                        if updates else "DO NOTHING"
+                    )
+                    sql += f" ON CONFLICT ({', '.join(self._ident(c) for c in keys)}) {action}"
+                sql += " RETURNING *"
+                cursor = self.conn.execute(sql, [self._value(row[c]) for c in columns])
+                stored.extend(dict(r) for r in cursor.fetchall())
+        return stored
+
+    def insert(self, table: str, rows: Rows) -> List[Dict[str, Any]]:
+        return self._write_rows(table, rows, None)
+
+    def upsert(self, table: str, rows: Rows, on_conflict: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._write_rows(table, rows, on_conflict or CONFLICT_KEYS.get(table, "id"))
+
+    def update(self, query: Query, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if not values:
+            return []
+        where, params = self._where(query)
+        assignments = ", ".join(f"{self._ident(c)} = ?" for c in values)
+        sql = f"UPDATE {self._ident(query.table)} SET {assignments}{where} RETURNING *"
+        return self.execute(sql, [self._value(v) for v in values.values()] + params)
+
+    def delete(self, query: Query) -> List[Dict[str, Any]]:
+        where, params = self._where(query)
+        return self.execute(f"DELETE FROM {self._ident(query.table)}{where} RETURNING *", params)
+
+    def rpc(self, function: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        handler = getattr(self, f"_rpc_{function}", None)
+        if handler is None:
+            raise ValueError(f"Unknown function: {function}")
+        return handler(**{k: self._value(v) for k, v in (params or {}).items()})
+
+    # ----- local implementations of data/supabase_functions.sql -----
+    def _rpc_unit_kpis(self, p_business_unit=None, p_start=None, p_end=None) -> List[Dict[str, Any]]:
+        params = {"unit": p_business_unit, "start": p_start, "end": p_end}
+        return self.execute("""
+            WITH scope AS (
+                SELECT DISTINCT business_unit FROM inventory
+                WHERE (:unit IS NULL OR business_unit = :unit)
+                UNION
+                SELECT DISTINCT business_unit FROM expenses
+                WHERE (:unit IS NULL OR business_unit = :unit)
+            ),
+            movements AS (
+                SELECT
+                    business_unit,
+                    SUM(CASE WHEN transaction_type = 'Purchase' THEN quantity_kg ELSE 0 END) AS purchased_kg,
+                    SUM(CASE WHEN transaction_type = 'Sale' THEN quantity_kg ELSE 0 END) AS sold_kg,
+                    SUM(CASE WHEN transaction_type = 'Purchase' THEN total_amount ELSE 0 END) AS purchase_cost,
+                    SUM(CASE WHEN transaction_type = 'Sale' THEN total_amount ELSE 0 END) AS sales_revenue
+                FROM inventory
+                WHERE (:unit IS NULL OR business_unit = :unit)
+                  AND (:start IS NULL OR substr(date, 1, 10) >= :start)
+                  AND (:end IS NULL OR substr(date, 1, 10) <= :end)
+                GROUP BY business_unit
+            ),
+            costs AS (
+                SELECT business_unit, SUM(amount) AS operating_expenses
+                FROM expenses
+                WHERE (:unit IS NULL OR business_unit = :unit)
+                  AND (:start IS NULL OR substr(date, 1, 10) >= :start)
+                  AND (:end IS NULL OR substr(date, 1, 10) <= :end)
+                  AND COALESCE(category, '') NOT IN ('Partner Withdrawal', 'Partner Contribution')
+                GROUP BY business_unit
+            )
+            SELECT
+                s.business_unit,
+                COALESCE(m.purchased_kg, 0.0) AS purchased_kg,
+                COALESCE(m.sold_kg, 0.0) AS sold_kg,
+                COALESCE(m.purchase_cost, 0.0) AS purchase_cost,
+                COALESCE(m.sales_revenue, 0.0) AS sales_revenue,
+                COALESCE(c.operating_expenses, 0.0) AS operating_expenses
+            FROM scope s
+            LEFT JOIN movements m ON m.business_unit = s.business_unit
+            LEFT JOIN costs c ON c.business_unit = s.business_unit
+            WHERE m.business_unit IS NOT NULL OR c.business_unit IS NOT NULL
+            ORDER BY s.business_unit
+        """, params)
+
+    def _rpc_open_cash_balance(self, p_business_unit, p_balance) -> List[Dict[str, Any]]:
+        with self.lock, self.conn:
+            self._open_cash_balance(p_business_unit, p_balance)
+        return [{"applied": True, "balance": p_balance}]
+
+    def _open_cash_balance(self, business_unit: str, balance: float) -> None:
+        self.conn.execute(
+            "INSERT INTO cash_balances (business_unit, balance, last_updated) "
+            "VALUES (?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now')) "
+            "ON CONFLICT (business_unit) DO UPDATE SET balance = excluded.balance, last_updated = excluded.last_updated",
+            (business_unit, balance)
+        )
+        self.conn.execute(
+            "INSERT INTO cash_checkpoints (business_unit, transaction_id, balance, kind) "
+            "SELECT ?, COALESCE(MAX(id), 0), ?, 'opening' FROM cash_transactions WHERE business_unit = ?",
+            (business_unit, balance, business_unit)
+        )
+
+    def _rpc_adjust_cash_balance(self, p_business_unit, p_amount, p_action, p_description=None,
+                                 p_idempotency_key=None) -> List[Dict[str, Any]]:
+        if p_amount is None or p_amount <= 0:
+            raise ValueError("Amount must be positive")
+        if p_action not in ("add", "subtract"):
+            raise ValueError(f"Invalid action: {p_action}")
+        with self.lock, self.conn:
+            exists = self.conn.execute(
+                "SELECT 1 FROM cash_balances WHERE business_unit = ?", (p_business_unit,)
+            ).fetchone()
+            if not exists:
+                self._open_cash_balance(p_business_unit, 0.0)
+            if p_idempotency_key is not None:
+                done = self.conn.execute(
+                    "SELECT new_balance FROM cash_transactions WHERE idempotency_key = ?", (p_idempotency_key,)
+                ).fetchone()
+                if done is not None:
+                    return [{"applied": True, "balance": done["new_balance"]}]
+            row = self.conn.execute(
+                "UPDATE cash_balances SET balance = balance + ?, "
+                "last_updated = strftime('%Y-%m-%dT%H:%M:%f', 'now') "
+                "WHERE business_unit = ? AND (? = 'add' OR balance >= ?) RETURNING balance",
+                (p_amount if p_action == "add" else -p_amount, p_business_unit, p_action, p_amount)
+            ).fetchone()
+            if row is None:
+                balance = self.conn.execute(
+                    "SELECT balance FROM cash_balances WHERE business_unit = ?", (p_business_unit,)
+                ).fetchone()["balance"]
+                return [{"applied": False, "balance": balance}]
+            transaction_id = self.conn.execute(
+                "INSERT INTO cash_transactions (business_unit, amount, action, description, new_balance, idempotency_key) "
+                "VALUES (?, ?, ?, ?, ?, ?) RETURNING id",
+                (p_business_unit, p_amount, p_action, p_description, row["balance"], p_idempotency_key)
+            ).fetchone()["id"]
+            tail = self.conn.execute(
+                "SELECT COUNT(*) AS n FROM cash_transactions WHERE business_unit = ? AND id > "
+                "(SELECT COALESCE(MAX(transaction_id), 0) FROM cash_checkpoints WHERE business_unit = ?)",
+                (p_business_unit, p_business_unit)
+            ).fetchone()["n"]
+            if tail >= LEDGER_CHECKPOINT_EVERY:
+                self.conn.execute(
+                    "INSERT INTO cash_checkpoints (business_unit, transaction_id, balance, kind) "
+                    "VALUES (?, ?, ?, 'snapshot')",
+                    (p_business_unit, transaction_id, row["balance"])
+                )
+            return [{"applied": True, "balance": row["balance"]}]
+
+    def _rpc_record_inventory(self, p_business_unit, p_transaction_type, p_date, p_quantity_kg, p_unit_price,
+                              p_remarks=None, p_idempotency_key=None) -> List[Dict[str, Any]]:
+        if p_quantity_kg is None or p_quantity_kg <= 0 or p_unit_price is None or p_unit_price <= 0:
+            raise ValueError("Quantity and price must be positive")
+        if p_transaction_type not in ("Purchase", "Sale"):
+            raise ValueError(f"Invalid transaction type: {p_transaction_type}")
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT purchased_kg - sold_kg AS available FROM unit_stock WHERE business_unit = ?", (p_business_unit,)
+            ).fetchone()
+            available = row["available"] if row else 0.0
+            if p_idempotency_key is not None:
+                done = self.conn.execute(
+                    "SELECT id FROM inventory WHERE idempotency_key = ?", (p_idempotency_key,)
+                ).fetchone()
+                if done is not None:
+                    return [{"applied": True, "available": available, "id": done["id"]}]
+            if p_transaction_type == "Sale" and p_quantity_kg > available + 1e-9:
+                return [{"applied": False, "available": available, "id": None}]
+            inventory_id = self.conn.execute(
+                "INSERT INTO inventory (date, transaction_type, quantity_kg, unit_price, total_amount, remarks, "
+                "business_unit, idempotency_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?) RETURNING id",
+                (p_date, p_transaction_type, p_quantity_kg, p_unit_price, p_quantity_kg * p_unit_price,
+                 p_remarks, p_business_unit, p_idempotency_key)
+            ).fetchone()["id"]
+            change = p_quantity_kg if p_transaction_type == "Purchase" else -p_quantity_kg
+            return [{"applied": True, "available": available + change, "id": inventory_id}]
+
+    def _rpc_dashboard_snapshot(self, p_price_history=30) -> List[Dict[str, Any]]:
+        with self.lock, self.conn:
+            units = [dict(row) for row in self.conn.execute("""
+                WITH costs AS (
+                    SELECT business_unit, SUM(amount) AS operating_expenses
+                    FROM expenses
+                    WHERE COALESCE(category, '') NOT IN ('Partner Withdrawal', 'Partner Contribution')
+                    GROUP BY business_unit
+                ),
+                units AS (
+                    SELECT business_unit FROM cash_balances
+                    UNION SELECT business_unit FROM unit_stock
+                    UNION SELECT business_unit FROM costs
+                )
+                SELECT
+                    u.business_unit,
+                    COALESCE(b.balance, 0.0) AS cash_balance,
+                    COALESCE(s.purchased_kg, 0.0) AS purchased_kg,
+                    COALESCE(s.sold_kg, 0.0) AS sold_kg,
+                    COALESCE(s.purchase_cost, 0.0) AS purchase_cost,
+                    COALESCE(s.sales_revenue, 0.0) AS sales_revenue,
+                    COALESCE(c.operating_expenses, 0.0) AS operating_expenses
+                FROM units u
+                LEFT JOIN cash_balances b ON b.business_unit = u.business_unit
+                LEFT JOIN unit_stock s ON s.business_unit = u.business_unit
+                LEFT JOIN costs c ON c.business_unit = u.business_unit
+                ORDER BY u.business_unit
+            """)]
+            prices = [dict(row) for row in self.conn.execute(
+                "SELECT price, date FROM market_prices ORDER BY date DESC LIMIT ?", (p_price_history,)
+            )]
+        return [{"payload": {"units": units, "prices": prices}}]
+
+    def _rpc_cash_balance_at(self, p_business_unit, p_at=None) -> List[Dict[str, Any]]:
+        params = {"unit": p_business_unit, "at": p_at}
+        return self.execute("""
+            WITH checkpoint AS (
+                SELECT transaction_id, balance FROM cash_checkpoints
+                WHERE business_unit = :unit AND (:at IS NULL OR as_of <= :at)
+                ORDER BY transaction_id DESC, id DESC
+                LIMIT 1
+            )
+            SELECT
+                COALESCE((SELECT balance FROM checkpoint), 0.0)
+                + COALESCE((
+                    SELECT SUM(CASE WHEN action = 'subtract' THEN -amount ELSE amount END)
+                    FROM cash_transactions
+                    WHERE business_unit = :unit
+                      AND id > COALESCE((SELECT transaction_id FROM checkpoint), 0)
+                      AND (:at IS NULL OR timestamp <= :at)
+                ), 0.0) AS balance
+        """, params)
+
+class CachedRepository(Repository):
+    """
+    Wraps a backend with the process-wide TTL cache in data/cache.py.
+
+    Reads of CACHED_TABLES and of functions listed in RPC_TABLES are shared by
+    all sessions; writes invalidate the entries that read the written table.
+    """
+
+    def __init__(self, backend: Repository, cache: Optional[TTLCache] = None):
+        self.backend = backend
+        self.cache = cache or TTLCache()
+        self.name = backend.name
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self.backend, attribute)
+
+    def _cached(self, key, tables: Tuple[str, ...], load, ttl: Optional[float] = None) -> List[Dict[str, Any]]:
+        try:
+            hash(key)
+        except TypeError:
+            return load()
+        rows = self.cache.get(key)
+        if rows is MISS:
+            generation = self.cache.generation(tables)
+            rows = load()
+            self.cache.put(key, rows, tables, generation, ttl)
+        return list(rows)
+
+    def fetch(self, query: Query) -> List[Dict[str, Any]]:
+        if query.table not in CACHED_TABLES:
+            return self.backend.fetch(query)
+        return self._cached(("fetch", query), (query.table,), lambda: self.backend.fetch(query))
+
+    def count(self, query: Query) -> int:
+        query = replace(query, columns="*", ordering=(), limit_rows=None, offset_rows=None)
+        if query.table not in CACHED_TABLES:
+            return self.backend.count(query)
+        rows = self._cached(("count", query), (query.table,), lambda: [{"count": self.backend.count(query)}])
+        return rows[0]["count"]
+
+    def pages(self, query: Query, page_size: int = PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        # Streamed reads go to the backend: caching every page would hold the
+        # whole table in the process cache, which streaming exists to avoid.
+        # A read that ends within its first page is cached like a fetch.
+        if query.table not in CACHED_TABLES:
+            yield from self.backend.pages(query, page_size)
+            return
+        key = ("pages", query, page_size)
+        rows = self.cache.get(key)
+        if rows is MISS:
+            generation = self.cache.generation((query.table,))
+            streamed = self.backend.pages(query, page_size)
+            rows, following = next(streamed, []), next(streamed, None)
+            if following is not None:
+                yield rows
+                yield following
+                yield from streamed
+                return
+            self.cache.put(key, rows, (query.table,), generation)
+        if rows:
+            yield list(rows)
+
+    def rpc(self, function: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        if function in RPC_WRITES:
+            rows = self.backend.rpc(function, params)
+            for table in RPC_WRITES[function]:
+                self.cache.invalidate(table)
+            return rows
+        if function not in RPC_TABLES:
+            return self.backend.rpc(function, params)
+        key = ("rpc", function, tuple(sorted((params or {}).items())))
+        return self._cached(key, RPC_TABLES[function], lambda: self.backend.rpc(function, params),
+                            RPC_TTLS.get(function))
+
+    def _written(self, table: str, result: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for written in written_tables(table):
+            self.cache.invalidate(written)
+        return result
+
+    def insert(self, table: str, rows: Rows) -> List[Dict[str, Any]]:
+        return self._written(table, self.backend.insert(table, rows))
+
+    def upsert(self, table: str, rows: Rows, on_conflict: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._written(table, self.backend.upsert(table, rows, on_conflict))
+
+    def update(self, query: Query, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return self._written(query.table, self.backend.update(query, values))
+
+    def delete(self, query: Query) -> List[Dict[str, Any]]:
+        return self._written(query.table, self.backend.delete(query))
+
+class MemoRepository(Repository):
+    """
+    Wraps a backend so identical reads within one script run hit it once.
+
+    Writes pass straight through and drop the memoised reads of their table
+    (see data/memo.py). Backend-specific attributes are delegated.
+    """
+
+    def __init__(self, backend: Repository):
+        self.backend = backend
+        self.name = backend.name
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self.backend, attribute)
+
+    def fetch(self, query: Query) -> List[Dict[str, Any]]:
+        return memo.remember(("fetch", query), lambda: self.backend.fetch(query))
+
+    def count(self, query: Query) -> int:
+        query = replace(query, columns="*", ordering=(), limit_rows=None, offset_rows=None)
+        return memo.remember(("fetch", query, "count"), lambda: [{"count": self.backend.count(query)}])[0]["count"]
+
+    def pages(self, query: Query, page_size: int = PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        # Streamed reads can be large; keep them out of the per-run memo
+        return self.backend.pages(query, page_size)
+
+    def rpc(self, function: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        if function in RPC_WRITES:
+            for table in RPC_WRITES[function]:
+                memo.forget(table)
+            return self.backend.rpc(function, params)
+        key = ("rpc", function, tuple(sorted((params or {}).items())))
+        return memo.remember(key, lambda: self.backend.rpc(function, params))
+
+    @staticmethod
+    def _forget(table: str) -> None:
+        for written in written_tables(table):
+            memo.forget(written)
+
+    def insert(self, table: str, rows: Rows) -> List[Dict[str, Any]]:
+        self._forget(table)
+        return self.backend.insert(table, rows)
+
+    def upsert(self, table: str, rows: Rows, on_conflict: Optional[str] = None) -> List[Dict[str, Any]]:
+        self._forget(table)
+        return self.backend.upsert(table, rows, on_conflict)
+
+    def update(self, query: Query, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        self._forget(query.table)
+        return self.backend.update(query, values)
+
+    def delete(self, query: Query) -> List[Dict[str, Any]]:
+        self._forget(query.table)
+        return self.backend.delete(query)
+
+def create_repository(backend: str = BACKEND) -> Repository:
+    """Build a repository for the requested backend"""
+    if backend == "sqlite":
+        logger.info(f"Using local SQLite backend at {SQLITE_PATH}")
+        return SQLiteRepository(SQLITE_PATH)
+    if backend == "supabase":
+        return SupabaseRepository(get_supabase())
+    raise ValueError(f"Unknown backend: {backend}")
+
+@st.cache_resource
+def get_repository() -> Repository:
+    """Process-wide repository selected by the BIZMASTER_BACKEND setting"""
+    return MemoRepository(CachedRepository(create_repository()))
@@ -0,0 +1,117 @@
+"""
+Declarative column dtypes for every table the app loads into DataFrames.
+
+coerce() applies a table's schema to a freshly built frame in one pass:
+low-cardinality text (business unit, transaction type, category, payment
+method, ...) becomes categorical, money and quantities float64, ids int64
+and date/timestamp strings datetime64 (UTC, timezone-naive). Columns the
+frame does not have are skipped, so projections can be coerced too.
+"""
+from typing import Dict
+
+import pandas as pd
+
+DATETIME = "datetime64[ns]"
+
+TABLE_SCHEMAS: Dict[str, Dict[str, str]] = {
+    "inventory": {
+        "id": "int64",
+        "date": DATETIME,
+        "transaction_type": "category",
+        "quantity_kg": "float64",
+        "unit_price": "float64",
+        "total_amount": "float64",
+        "business_unit": "category",
+        "created_at": DATETIME,
+    },
+    "unit_stock": {
+        "business_unit": "category",
+        "purchased_kg": "float64",
+        "sold_kg": "float64",
+        "purchase_cost": "float64",
+        "sales_revenue": "float64",
+        "updated_at": DATETIME,
+    },
+    "inventory_rollups": {
+        "business_unit": "category",
+        "grain": "category",
+        "purchased_kg": "float64",
+        "sold_kg": "float64",
+        "purchase_cost": "float64",
+        "sales_revenue": "float64",
+    },
+    "expenses": {
+        "id": "int64",
+        "date": DATETIME,
+        "category": "category",
+        "amount": "float64",
+        "business_unit": "category",
+        "payment_method": "category",
+        "partner": "category",
+        "created_at": DATETIME,
+    },
+    "investments": {
+        "id": "int64",
+        "business_unit": "category",
+        "inv_date": DATETIME,
+        "amount": "float64",
+        "investor": "category",
+        "created_at": DATETIME,
+    },
+    "partnerships": {
+        "id": "int64",
+        "business_unit": "category",
+        "share": "float64",
+        "withdrawn": "float64",
+        "invested": "float64",
+    },
+    "cash_balances": {
+        "business_unit": "category",
+        "balance": "float64",
+        "last_updated": DATETIME,
+    },
+    "cash_transactions": {
+        "id": "int64",
+        "business_unit": "category",
+        "amount": "float64",
+        "action": "category",
+        "timestamp": DATETIME,
+        "new_balance": "float64",
+    },
+    "cash_checkpoints": {
+        "id": "int64",
+        "business_unit": "category",
+        "transaction_id": "int64",
+        "balance": "float64",
+        "kind": "category",
+        "as_of": DATETIME,
+    },
+    "market_prices": {
+        "id": "int64",
+        "price": "float64",
+        "date": DATETIME,
+    },
+}
+
+def coerce(frame: pd.DataFrame, table: str) -> pd.DataFrame:
+    """Return frame with the table's declared dtypes; unknown tables are returned unchanged"""
+    schema = {c: d for c, d in TABLE_SCHEMAS.get(table, {}).items() if c in frame.columns}
+    if not schema:
+        return frame
+    frame = frame.copy(deep=False)
+    casts = {}
+    for column, dtype in schema.items():
+        series = frame[column]
+        if str(series.dtype) == dtype or (dtype == DATETIME and pd.api.types.is_datetime64_dtype(series)):
+            continue
+        if dtype == DATETIME:
+            # Mixed naive dates and offset timestamps are normalised to naive UTC
+            frame[column] = pd.to_datetime(series, errors="coerce", utc=True, format="ISO8601").dt.tz_localize(None)
+        elif dtype in ("float64", "int64") and series.dtype == object:
+            numeric = pd.to_numeric(series, errors="coerce")
+            frame[column] = numeric if dtype == "float64" or numeric.isna().any() else numeric.astype(dtype)
+        elif dtype == "int64" and series.isna().any():
+            continue
+        else:
+            casts[column] = dtype
+    return frame.astype(casts) if casts else frame
@@ -0,0 +1,276 @@
+"""
+Process-wide, read-only snapshot of the session tables.
+
+Every session of the running app reads the same inventory, expenses,
+investments and partnerships frames instead of downloading and holding its
+own copies. Whichever session first finds the snapshot older than
+SYNC_INTERVAL refreshes it for everyone: a delta sync by id high-water mark,
+or a full reload every FULL_SYNC_INTERVAL. A refresh builds new frames and
+swaps them in, so frames already handed out are never modified.
+
+Sessions read through session_view(): the rows their business unit may see,
+as copies that a session can edit without touching the snapshot. Under
+pandas 3 copy-on-write the copies share memory with the snapshot until
+edited; older pandas gets real copies.
+"""
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from data import warm_cache
+from data.repository import Query, Repository, get_repository
+from data.projections import (
+    InventoryRow, InvestmentRow, ExpenseRow, PartnershipRow, CashBalanceView, columns, column_list
+)
+from data.queries import fetch_frame
+from data.schema import coerce
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# pandas 3 always copies on write, so a shallow copy cannot change the shared
+# frames; earlier versions only do when the global option is set, which this
+# module does not touch
+COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3
+
+# Tables loaded into session state and their projections, fetched
+# concurrently by load_tables
+SESSION_VIEWS = {
+    "inventory": InventoryRow,
+    "cash_balances": CashBalanceView,
+    "investments": InvestmentRow,
+    "expenses": ExpenseRow,
+    "partnerships": PartnershipRow,
+}
+SESSION_TABLES = {name: Query(name, columns(view)) for name, view in SESSION_VIEWS.items()}
+
+# Append-mostly tables synced by id high-water mark (session key, projection);
+# the other session tables are a handful of rows and are reloaded whole
+DELTA_TABLES = {
+    "inventory": ("inventory", InventoryRow),
+    "expenses": ("expenses", ExpenseRow),
+    "investments": ("investments", InvestmentRow),
+}
+
+# How often new rows are pulled, and how often everything is reloaded to pick
+# up edits and deletions that an id high-water mark cannot see
+SYNC_INTERVAL = timedelta(seconds=float(os.getenv("BIZMASTER_SYNC_SECONDS", "60")))
+FULL_SYNC_INTERVAL = timedelta(minutes=float(os.getenv("BIZMASTER_FULL_SYNC_MINUTES", "30")))
+
+# Seconds to wait for each table before giving up on it
+LOAD_TIMEOUT = float(os.getenv("BIZMASTER_LOAD_TIMEOUT", "10"))
+TABLE_TIMEOUTS = {
+    "inventory": LOAD_TIMEOUT * 2,
+    "expenses": LOAD_TIMEOUT * 2,
+}
+
+def load_tables(queries: Dict[str, Query], timeouts: Optional[Dict[str, float]] = None,
+                source: Optional[Repository] = None) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+    """
+    Fetch several session tables concurrently.
+
+    Each table is streamed page by page into its frame (fetch_frame), so no
+    table is ever held as one list of row dicts. Tables are not counted first:
+    most loads are delta syncs of a few rows, where a count would double the
+    round trips. Each table gets its own timeout (TABLE_TIMEOUTS, default LOAD_TIMEOUT)
+    counted from the moment all requests are started, so the total wait is
+    bounded by the slowest table rather than the sum.
+
+    Returns:
+        tuple: (frame by table for the loads that succeeded, error message by table for the rest)
+    """
+    source = source or get_repository()
+    timeouts = timeouts or TABLE_TIMEOUTS
+    results, errors = {}, {}
+    pool = ThreadPoolExecutor(max_workers=max(len(queries), 1), thread_name_prefix="table-load")
+    try:
+        started = time.monotonic()
+        futures = {
+            name: pool.submit(fetch_frame, query, SESSION_VIEWS[query.table], source, counted=False)
+            for name, query in queries.items()
+        }
+        for name, future in futures.items():
+            timeout = timeouts.get(name, LOAD_TIMEOUT)
+            try:
+                results[name] = future.result(timeout=max(0.0, started + timeout - time.monotonic()))
+            except FutureTimeout:
+                errors[name] = f"timed out after {timeout:g}s"
+            except Exception as e:
+                errors[name] = str(e)
+    finally:
+        # Do not wait for timed-out requests; their results are discarded
+        pool.shutdown(wait=False, cancel_futures=True)
+    for name, error in errors.items():
+        logger.warning(f"Loading {name} failed: {error}")
+    return results, errors
+
+def _frame(rows: Optional[List[Dict]], view: type, table: str) -> pd.DataFrame:
+    return coerce(pd.DataFrame(rows or [], columns=column_list(view)), table)
+
+class SharedTables:
+    """
+    The session tables as loaded once for the whole process.
+
+    frames holds the DataFrames by table name and cash_balances the balance
+    by unit. version increases with every refresh so sessions know when to
+    rebuild their views. All refreshes run under one lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self.cash_balances: Dict[str, float] = {}
+        self.marks: Dict[str, int] = {}
+        self.errors: Dict[str, str] = {}
+        self.synced_at = datetime.min
+        self.full_synced_at = datetime.min
+        self.version = 0
+
+    def sync(self, force: bool = False) -> bool:
+        """
+        Refresh the snapshot if it is due, or a delta sync now if force is set.
+
+        Returns:
+            bool: True if this call refreshed the snapshot
+        """
+        with self.lock:
+            now = datetime.now()
+            if not self.frames:
+                if not self._warm_start():
+                    self._full_load()
+            elif now - self.full_synced_at > FULL_SYNC_INTERVAL:
+                self._full_load()
+            elif force or now - self.synced_at > SYNC_INTERVAL:
+                self._delta_sync()
+            else:
+                return False
+            return True
+
+    def reload(self) -> None:
+        """Reload every table from the database now"""
+        with self.lock:
+            self._full_load()
+
+    def set_cash_balance(self, business_unit: str, balance: float) -> None:
+        with self.lock:
+            self.cash_balances = {**self.cash_balances, business_unit: balance}
+
+    def _apply(self, results: Dict[str, pd.DataFrame]) -> None:
+        """Swap in freshly loaded tables; tables missing from results keep their previous frames"""
+        frames = dict(self.frames)
+        for name in ('inventory', 'investments', 'expenses', 'partnerships'):
+            if name in results or name not in frames:
+                frames[name] = results[name] if name in results else _frame(None, SESSION_VIEWS[name], name)
+        if 'cash_balances' in results or not self.cash_balances:
+            balances = results.get('cash_balances')
+            self.cash_balances = dict(
+                zip(balances['business_unit'], balances['balance'].astype(float))
+            ) if balances is not None and not balances.empty else {unit: 0.0 for unit in ['Unit A', 'Unit B']}
+        self.frames = frames
+
+    def _advance_marks(self, results: Dict[str, pd.DataFrame]) -> None:
+        """Move each synced table's high-water mark to the largest id loaded"""
+        for name, frame in results.items():
+            if name in DELTA_TABLES and not frame.empty:
+                self.marks[name] = max(self.marks.get(name, 0), int(frame['id'].max()))
+
+    def _finish(self, results: Dict[str, pd.DataFrame], errors: Dict[str, str]) -> None:
+        self._advance_marks(results)
+        self.errors = errors
+        self.synced_at = datetime.now()
+        self.version += 1
+
+    def _save_snapshots(self, names) -> None:
+        """Write the on-disk warm cache of the given delta tables"""
+        for name in names:
+            warm_cache.save(name, self.frames[name], DELTA_TABLES[name][1], self.marks.get(name, 0))
+
+    def _full_load(self) -> None:
+        """Reload every table; tables that fail or time out keep their previous frames"""
+        self.marks = {}
+        results, errors = load_tables(SESSION_TABLES)
+        self._apply(results)
+        self._finish(results, errors)
+        self.full_synced_at = self.synced_at
+        self._save_snapshots(set(results) & set(DELTA_TABLES))
+
+    def _warm_start(self) -> bool:
+        """
+        Seed the delta tables from the on-disk warm cache, then sync only newer rows.
+
+        A snapshot is used only if the database still holds exactly its rows up
+        to its mark (the app never edits these tables in place, so a count
+        catches resets and deletions); otherwise nothing is seeded.
+
+        Returns:
+            bool: True if the snapshot was loaded this way
+        """
+        snapshots = {name: warm_cache.load(name, view) for name, (_, view) in DELTA_TABLES.items()}
+        if not all(snapshots.values()):
+            return False
+        try:
+            for name, (frame, mark) in snapshots.items():
+                if get_repository().count(Query(name).lte("id", mark)) != len(frame):
+                    logger.info(f"Warm cache for {name} is stale; loading from the database")
+                    return False
+        except Exception as e:
+            logger.warning(f"Could not validate warm cache: {str(e)}")
+            return False
+
+        self.frames = {name: frame for name, (frame, _) in snapshots.items()}
+        self.marks = {name: mark for name, (_, mark) in snapshots.items()}
+        self._delta_sync()
+        self.full_synced_at = self.synced_at
+        return True
+
+    def _delta_sync(self) -> None:
+        """
+        Fetch only rows above each table's high-water mark and append them.
+
+        Small tables (cash balances, partnerships) are reloaded whole, and so
+        is a delta table that has no mark yet.
+        """
+        queries, appended = {}, set()
+        for name, query in SESSION_TABLES.items():
+            if name in DELTA_TABLES and name in self.frames and name in self.marks:
+                query = query.gt("id", self.marks[name])
+                appended.add(name)
+            queries[name] = query
+
+        results, errors = load_tables(queries)
+        new_rows = {name: results.pop(name) for name in appended & set(results)}
+        frames = dict(self.frames)
+        for name, rows in new_rows.items():
+            if not rows.empty:
+                merged = pd.concat([frames[name], rows], ignore_index=True)
+                # concat widens categoricals with different categories to object
+                frames[name] = coerce(merged.drop_duplicates('id', keep='last').reset_index(drop=True), name)
+        self.frames = frames
+        self._apply(results)
+        self._finish({**results, **new_rows}, errors)
+        self._save_snapshots(name for name, rows in new_rows.items() if not rows.empty)
+
+@st.cache_resource
+def shared_tables() -> SharedTables:
+    """The process-wide snapshot, shared by every session"""
+    return SharedTables()
+
+def session_view(frame: pd.DataFrame, business_unit: str = "All") -> pd.DataFrame:
+    """
+    A session's copy of a shared frame: only the permitted business unit's rows.
+
+    Edits to the copy never reach the snapshot. With copy-on-write the
+    all-units copy is shallow and shares memory until the session edits it;
+    otherwise it is a deep copy. Selecting one unit's rows always builds new columns.
+    """
+    if business_unit in (None, "All"):
+        return frame.copy(deep=not COPY_ON_WRITE)
+    return frame[frame['business_unit'] == business_unit].reset_index(drop=True)
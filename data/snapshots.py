@@ -0,0 +1,247 @@
+"""
+Point-in-time stock and valuation snapshots.
+
+take_snapshots is the end-of-day job. For every day with inventory activity
+it writes one stock_snapshots row per unit with stock kg, FIFO and
+weighted-average lot value, the market price and the market value, plus the
+open FIFO lots. It starts from the unit's latest snapshot and appends only
+the transactions after it to LotLedgers (data/costing.py). Back-dated
+inventory is caught by last_id and row_count, and the snapshots from its
+date onwards are rewritten in place: rows are upserted on (business_unit,
+as_of), so readers never find a day's snapshot missing while the job runs.
+
+position_at answers "stock and value of a unit on day D" in constant time.
+It reads the nearest snapshot on or before D that still matches the
+inventory (same last_id and row_count checks), seeds a ledger with its open
+lots and replays only the transactions between the snapshot and D. Without
+a matching snapshot it replays the unit's history up to D.
+
+Run the job nightly (or to backfill) with:
+    python -m data.snapshots [--through YYYY-MM-DD] [--unit "Unit A"] [--rebuild]
+Pages only read snapshots; admins can also run the job from the
+diagnostics page.
+"""
+import json
+import logging
+import argparse
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data.costing import COSTING_METHOD, METHODS, LotLedger
+from data.projections import LotView, PriceView, SnapshotView, columns, column_list
+from data.queries import fetch_frame
+from data.repository import Query, get_repository
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INSERT_BATCH_SIZE = 500
+SNAPSHOT_KEY = "business_unit,as_of"
+
+# Units snapshotted by default: the business units the app is set up with
+# (a unit without inventory gets no snapshots)
+BUSINESS_UNITS = ["Unit A", "Unit B"]
+
+def _day(value: Any) -> date:
+    return value if isinstance(value, date) and not isinstance(value, datetime) else pd.Timestamp(value).date()
+
+def _next_day(day: date) -> str:
+    """Exclusive upper bound for a day's rows, whether dates carry a time or not"""
+    return (day + timedelta(days=1)).isoformat()
+
+def _parse_lots(lots: Any) -> List[List[float]]:
+    """jsonb arrives parsed from Postgres and as text from SQLite"""
+    return json.loads(lots) if isinstance(lots, str) else list(lots or [])
+
+def _seed_rows(snapshot: Dict[str, Any], method: str) -> pd.DataFrame:
+    """Synthetic purchases, dated at the snapshot, that recreate its open lots"""
+    if method == "wavg":
+        lots = [[snapshot["stock_kg"], snapshot["wavg_value"] / snapshot["stock_kg"]]] if snapshot["stock_kg"] > 0 else []
+    else:
+        lots = _parse_lots(snapshot["lots"])
+    return pd.DataFrame({
+        "id": np.zeros(len(lots), dtype=np.int64),
+        "date": pd.Timestamp(_day(snapshot["as_of"])),
+        "transaction_type": "Purchase",
+        "quantity_kg": [kg for kg, _ in lots],
+        "total_amount": [kg * cost for kg, cost in lots],
+    }, columns=column_list(LotView))
+
+def _seeded_ledger(snapshot: Optional[Dict[str, Any]], method: str) -> LotLedger:
+    ledger = LotLedger(method)
+    if snapshot is not None:
+        ledger.append(_seed_rows(snapshot, method))
+    return ledger
+
+def _fetch_rows(business_unit: str, after: Optional[date], through: date) -> pd.DataFrame:
+    """Inventory of a unit dated after one day (exclusive) up to another (inclusive)"""
+    query = Query("inventory").eq("business_unit", business_unit).lt("date", _next_day(through))
+    if after is not None:
+        query = query.gte("date", _next_day(after))
+    return fetch_frame(query, LotView)
+
+def latest_snapshot(business_unit: str, on_or_before: Optional[date] = None) -> Optional[Dict[str, Any]]:
+    """The unit's most recent snapshot, optionally no later than a day"""
+    query = Query("stock_snapshots", columns(SnapshotView)).eq("business_unit", business_unit)
+    if on_or_before is not None:
+        query = query.lte("as_of", on_or_before.isoformat())
+    rows = get_repository().fetch(query.order("as_of", desc=True).limit(1))
+    return rows[0] if rows else None
+
+def _stale_from(snapshot: Dict[str, Any]) -> Optional[date]:
+    """Earliest date of inventory inserted at or before a snapshot's day after it was taken"""
+    rows = get_repository().fetch(
+        Query("inventory", "date").eq("business_unit", snapshot["business_unit"]).gt("id", snapshot["last_id"])
+        .lt("date", _next_day(_day(snapshot["as_of"]))).order("date").limit(1)
+    )
+    return _day(rows[0]["date"]) if rows else None
+
+def _valid_snapshot(business_unit: str, on_or_before: Optional[date] = None) -> Optional[Dict[str, Any]]:
+    """
+    Latest snapshot still matching the inventory up to its day, or None.
+
+    Back-dated inserts (ids above last_id) fall back to the snapshot before
+    the earliest of them. Deletes leave ids untouched but change the row
+    count; the deleted rows' dates are unknown, so nothing is trusted then.
+    """
+    snapshot = latest_snapshot(business_unit, on_or_before)
+    while snapshot is not None:
+        stale = _stale_from(snapshot)
+        if stale is None:
+            break
+        snapshot = latest_snapshot(business_unit, stale - timedelta(days=1))
+    if snapshot is None:
+        return None
+    counted = get_repository().count(
+        Query("inventory").eq("business_unit", business_unit).lt("date", _next_day(_day(snapshot["as_of"])))
+    )
+    if counted != snapshot["row_count"]:
+        logger.info(f"{business_unit}: inventory before {snapshot['as_of']} changed; not using its snapshots")
+        return None
+    return snapshot
+
+def _price_at(day: date) -> Optional[float]:
+    rows = get_repository().fetch(
+        Query("market_prices", columns(PriceView)).lt("date", _next_day(day)).order("date", desc=True).limit(1)
+    )
+    return float(rows[0]["price"]) if rows else None
+
+def take_snapshots(through: Optional[date] = None, units: Optional[Iterable[str]] = None,
+                   rebuild: bool = False) -> int:
+    """
+    Write end-of-day snapshots for every day with inventory activity up to a day.
+
+    Args:
+        through (date): Last day to snapshot (yesterday by default, the last complete day)
+        units (iterable): Business units (BUSINESS_UNITS by default)
+        rebuild (bool): Discard existing snapshots and rebuild from the first transaction
+
+    Returns:
+        int: Snapshots written
+    """
+    repository = get_repository()
+    through = through or date.today() - timedelta(days=1)
+    units = list(units) if units is not None else BUSINESS_UNITS
+    prices = fetch_frame(Query("market_prices").lt("date", _next_day(through)), PriceView).sort_values("date")
+    price_days = prices["date"].to_numpy(dtype="datetime64[ns]")
+    written = 0
+    for unit in units:
+        start = None if rebuild else _valid_snapshot(unit, through)
+        after = _day(start["as_of"]) if start is not None else None
+
+        ledgers = {method: _seeded_ledger(start, method) for method in METHODS}
+        row_count = int(start["row_count"]) if start is not None else 0
+        last_id = int(start["last_id"]) if start is not None else 0
+        rows = _fetch_rows(unit, after, through).sort_values(['date', 'id'], kind='stable')
+        # Arrays once per unit; each day is then a slice (no per-day pandas work)
+        days = rows['date'].dt.normalize().to_numpy(dtype="datetime64[ns]")
+        dates = rows['date'].to_numpy(dtype="datetime64[ns]")
+        ids = rows['id'].to_numpy(dtype=np.int64)
+        costed = rows['transaction_type'].isin(['Purchase', 'Sale']).to_numpy()
+        is_purchase = (rows['transaction_type'] == 'Purchase').to_numpy()
+        kg = rows['quantity_kg'].to_numpy(dtype=float)
+        amount = rows['total_amount'].to_numpy(dtype=float)
+        boundaries = np.flatnonzero(np.diff(days)) + 1
+        snapshots = []
+        for begin, end in zip(np.concatenate(([0], boundaries)), np.concatenate((boundaries, [len(days)]))):
+            if begin == end:
+                continue
+            day = days[begin]
+            keep = np.arange(begin, end)[costed[begin:end]]
+            for ledger in ledgers.values():
+                ledger.append_arrays(dates[keep], ids[keep], is_purchase[keep], kg[keep], amount[keep])
+            row_count += int(end - begin)
+            last_id = max(last_id, int(ids[begin:end].max()))
+            stock_kg, fifo_value = ledgers["fifo"].stock()
+            position = np.searchsorted(price_days, day + np.timedelta64(1, "D"), side="left") - 1
+            price = float(prices["price"].iloc[position]) if position >= 0 else None
+            _, lot_kg, lot_cost = ledgers["fifo"].open_lots()
+            snapshots.append({
+                "business_unit": unit,
+                "as_of": str(day.astype("datetime64[D]")),
+                "stock_kg": stock_kg,
+                "fifo_value": fifo_value,
+                "wavg_value": ledgers["wavg"].stock()[1],
+                "market_price": price,
+                "market_value": stock_kg * price if price is not None else None,
+                "lots": json.dumps(np.round(np.column_stack((lot_kg, lot_cost)), 6).tolist()),
+                "last_id": last_id,
+                "row_count": row_count,
+            })
+        # Snapshots after the starting point are overwritten, then those of
+        # days that no longer have any activity are dropped
+        for begin in range(0, len(snapshots), INSERT_BATCH_SIZE):
+            repository.upsert("stock_snapshots", snapshots[begin:begin + INSERT_BATCH_SIZE], on_conflict=SNAPSHOT_KEY)
+        kept = {snapshot["as_of"] for snapshot in snapshots}
+        existing = Query("stock_snapshots", "id, as_of").eq("business_unit", unit).lte("as_of", through.isoformat())
+        if after is not None:
+            existing = existing.gt("as_of", after.isoformat())
+        dropped = [row["id"] for page in repository.pages(existing) for row in page if str(row["as_of"])[:10] not in kept]
+        for begin in range(0, len(dropped), INSERT_BATCH_SIZE):
+            repository.delete(Query("stock_snapshots").in_("id", dropped[begin:begin + INSERT_BATCH_SIZE]))
+        written += len(snapshots)
+        logger.info(f"{unit}: {len(snapshots)} snapshots written through {through}")
+    return written
+
+def position_at(business_unit: str, day: date, method: str = COSTING_METHOD) -> Dict[str, Any]:
+    """
+    Stock and valuation of a unit at the end of a day.
+
+    Returns:
+        dict: stock_kg, lot_value (at the costing method), market_price,
+        market_value, snapshot (day of the snapshot used, or None) and
+        replayed (transactions applied on top of it)
+    """
+    snapshot = _valid_snapshot(business_unit, day)
+    after = _day(snapshot["as_of"]) if snapshot is not None else None
+    tail = _fetch_rows(business_unit, after, day)
+    ledger = _seeded_ledger(snapshot, method)
+    ledger.append(tail)
+    stock_kg, lot_value = ledger.stock()
+    price = _price_at(day)
+    return {
+        "business_unit": business_unit,
+        "as_of": day,
+        "stock_kg": stock_kg,
+        "lot_value": lot_value,
+        "market_price": price,
+        "market_value": stock_kg * price if price is not None else None,
+        "snapshot": after,
+        "replayed": len(tail),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write end-of-day stock snapshots")
+    parser.add_argument("--through", type=date.fromisoformat, help="last day to snapshot (default: yesterday)")
+    parser.add_argument("--unit", action="append", help="business unit (repeatable; default: all)")
+    parser.add_argument("--rebuild", action="store_true", help="discard and rebuild existing snapshots")
+    args = parser.parse_args()
+    written = take_snapshots(args.through, args.unit, args.rebuild)
+    print(f"{written} snapshots written")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+-- Local SQLite stand-in for the Supabase tables used by BizMaster Pro.
+-- Applied idempotently every time a SQLiteRepository is opened.
+
+CREATE TABLE IF NOT EXISTS inventory (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    transaction_type TEXT NOT NULL,
+    quantity_kg REAL NOT NULL DEFAULT 0,
+    unit_price REAL NOT NULL DEFAULT 0,
+    total_amount REAL NOT NULL DEFAULT 0,
+    remarks TEXT,
+    business_unit TEXT NOT NULL,
+    idempotency_key TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+CREATE INDEX IF NOT EXISTS inventory_unit_date_idx ON inventory (business_unit, date);
+-- One row per form submission (NULL keys never collide)
+CREATE UNIQUE INDEX IF NOT EXISTS inventory_idempotency_key_idx ON inventory (idempotency_key);
+
+-- Running stock totals per unit, maintained by the triggers below
+CREATE TABLE IF NOT EXISTS unit_stock (
+    business_unit TEXT PRIMARY KEY,
+    purchased_kg REAL NOT NULL DEFAULT 0,
+    sold_kg REAL NOT NULL DEFAULT 0,
+    purchase_cost REAL NOT NULL DEFAULT 0,
+    sales_revenue REAL NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+-- Existing inventory is indexed once, before the triggers take over
+INSERT INTO unit_stock (business_unit, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+SELECT business_unit,
+       SUM(CASE WHEN transaction_type = 'Purchase' THEN quantity_kg ELSE 0 END),
+       SUM(CASE WHEN transaction_type = 'Sale' THEN quantity_kg ELSE 0 END),
+       SUM(CASE WHEN transaction_type = 'Purchase' THEN total_amount ELSE 0 END),
+       SUM(CASE WHEN transaction_type = 'Sale' THEN total_amount ELSE 0 END)
+FROM inventory
+WHERE NOT EXISTS (SELECT 1 FROM unit_stock)
+GROUP BY business_unit;
+
+-- Every inventory write adjusts its unit's totals (an update reverses the old row first)
+CREATE TRIGGER IF NOT EXISTS unit_stock_on_insert
+AFTER INSERT ON inventory
+BEGIN
+    INSERT INTO unit_stock (business_unit, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+    VALUES (
+        NEW.business_unit,
+        CASE WHEN NEW.transaction_type = 'Purchase' THEN NEW.quantity_kg ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Sale' THEN NEW.quantity_kg ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Purchase' THEN NEW.total_amount ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Sale' THEN NEW.total_amount ELSE 0 END
+    )
+    ON CONFLICT (business_unit) DO UPDATE SET
+        purchased_kg = purchased_kg + excluded.purchased_kg,
+        sold_kg = sold_kg + excluded.sold_kg,
+        purchase_cost = purchase_cost + excluded.purchase_cost,
+        sales_revenue = sales_revenue + excluded.sales_revenue,
+        updated_at = strftime('%Y-%m-%dT%H:%M:%f', 'now');
+END;
+CREATE TRIGGER IF NOT EXISTS unit_stock_on_delete
+AFTER DELETE ON inventory
+BEGIN
+    INSERT INTO unit_stock (business_unit, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+    VALUES (
+        OLD.business_unit,
+        -CASE WHEN OLD.transaction_type = 'Purchase' THEN OLD.quantity_kg ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Sale' THEN OLD.quantity_kg ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Purchase' THEN OLD.total_amount ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Sale' THEN OLD.total_amount ELSE 0 END
+    )
+    ON CONFLICT (business_unit) DO UPDATE SET
+        purchased_kg = purchased_kg + excluded.purchased_kg,
+        sold_kg = sold_kg + excluded.sold_kg,
+        purchase_cost = purchase_cost + excluded.purchase_cost,
+        sales_revenue = sales_revenue + excluded.sales_revenue,
+        updated_at = strftime('%Y-%m-%dT%H:%M:%f', 'now');
+END;
+CREATE TRIGGER IF NOT EXISTS unit_stock_on_update
+AFTER UPDATE ON inventory
+BEGIN
+    INSERT INTO unit_stock (business_unit, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+    VALUES (
+        OLD.business_unit,
+        -CASE WHEN OLD.transaction_type = 'Purchase' THEN OLD.quantity_kg ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Sale' THEN OLD.quantity_kg ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Purchase' THEN OLD.total_amount ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Sale' THEN OLD.total_amount ELSE 0 END
+    )
+    ON CONFLICT (business_unit) DO UPDATE SET
+        purchased_kg = purchased_kg + excluded.purchased_kg,
+        sold_kg = sold_kg + excluded.sold_kg,
+        purchase_cost = purchase_cost + excluded.purchase_cost,
+        sales_revenue = sales_revenue + excluded.sales_revenue,
+        updated_at = strftime('%Y-%m-%dT%H:%M:%f', 'now');
+    INSERT INTO unit_stock (business_unit, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+    VALUES (
+        NEW.business_unit,
+        CASE WHEN NEW.transaction_type = 'Purchase' THEN NEW.quantity_kg ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Sale' THEN NEW.quantity_kg ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Purchase' THEN NEW.total_amount ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Sale' THEN NEW.total_amount ELSE 0 END
+    )
+    ON CONFLICT (business_unit) DO UPDATE SET
+        purchased_kg = purchased_kg + excluded.purchased_kg,
+        sold_kg = sold_kg + excluded.sold_kg,
+        purchase_cost = purchase_cost + excluded.purchase_cost,
+        sales_revenue = sales_revenue + excluded.sales_revenue,
+        updated_at = strftime('%Y-%m-%dT%H:%M:%f', 'now');
+END;
+
+-- Purchase and sale totals per unit and day ('day', period YYYY-MM-DD) and
+-- month ('month', period YYYY-MM), maintained by the triggers below
+CREATE TABLE IF NOT EXISTS inventory_rollups (
+    business_unit TEXT NOT NULL,
+    grain TEXT NOT NULL,
+    period TEXT NOT NULL,
+    purchased_kg REAL NOT NULL DEFAULT 0,
+    sold_kg REAL NOT NULL DEFAULT 0,
+    purchase_cost REAL NOT NULL DEFAULT 0,
+    sales_revenue REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (business_unit, grain, period)
+);
+
+-- Existing inventory is rolled up once, before the triggers take over
+INSERT INTO inventory_rollups (business_unit, grain, period, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+SELECT business_unit, grain, period,
+       SUM(CASE WHEN transaction_type = 'Purchase' THEN quantity_kg ELSE 0 END),
+       SUM(CASE WHEN transaction_type = 'Sale' THEN quantity_kg ELSE 0 END),
+       SUM(CASE WHEN transaction_type = 'Purchase' THEN total_amount ELSE 0 END),
+       SUM(CASE WHEN transaction_type = 'Sale' THEN total_amount ELSE 0 END)
+FROM (
+    SELECT business_unit, 'day' AS grain, substr(date, 1, 10) AS period, transaction_type, quantity_kg, total_amount FROM inventory
+    UNION ALL
+    SELECT business_unit, 'month', substr(date, 1, 7), transaction_type, quantity_kg, total_amount FROM inventory
+)
+WHERE NOT EXISTS (SELECT 1 FROM inventory_rollups)
+GROUP BY business_unit, grain, period;
+
+CREATE TRIGGER IF NOT EXISTS inventory_rollups_on_insert
+AFTER INSERT ON inventory
+BEGIN
+    INSERT INTO inventory_rollups (business_unit, grain, period, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+    VALUES (
+        NEW.business_unit, 'day', substr(NEW.date, 1, 10),
+        CASE WHEN NEW.transaction_type = 'Purchase' THEN NEW.quantity_kg ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Sale' THEN NEW.quantity_kg ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Purchase' THEN NEW.total_amount ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Sale' THEN NEW.total_amount ELSE 0 END
+    )
+    ON CONFLICT (business_unit, grain, period) DO UPDATE SET
+        purchased_kg = purchased_kg + excluded.purchased_kg,
+        sold_kg = sold_kg + excluded.sold_kg,
+        purchase_cost = purchase_cost + excluded.purchase_cost,
+        sales_revenue = sales_revenue + excluded.sales_revenue;
+    INSERT INTO inventory_rollups (business_unit, grain, period, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+    VALUES (
+        NEW.business_unit, 'month', substr(NEW.date, 1, 7),
+        CASE WHEN NEW.transaction_type = 'Purchase' THEN NEW.quantity_kg ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Sale' THEN NEW.quantity_kg ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Purchase' THEN NEW.total_amount ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Sale' THEN NEW.total_amount ELSE 0 END
+    )
+    ON CONFLICT (business_unit, grain, period) DO UPDATE SET
+        purchased_kg = purchased_kg + excluded.purchased_kg,
+        sold_kg = sold_kg + excluded.sold_kg,
+        purchase_cost = purchase_cost + excluded.purchase_cost,
+        sales_revenue = sales_revenue + excluded.sales_revenue;
+END;
+CREATE TRIGGER IF NOT EXISTS inventory_rollups_on_delete
+AFTER DELETE ON inventory
+BEGIN
+    INSERT INTO inventory_rollups (business_unit, grain, period, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+    VALUES (
+        OLD.business_unit, 'day', substr(OLD.date, 1, 10),
+        -CASE WHEN OLD.transaction_type = 'Purchase' THEN OLD.quantity_kg ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Sale' THEN OLD.quantity_kg ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Purchase' THEN OLD.total_amount ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Sale' THEN OLD.total_amount ELSE 0 END
+    )
+    ON CONFLICT (business_unit, grain, period) DO UPDATE SET
+        purchased_kg = purchased_kg + excluded.purchased_kg,
+        sold_kg = sold_kg + excluded.sold_kg,
+        purchase_cost = purchase_cost + excluded.purchase_cost,
+        sales_revenue = sales_revenue + excluded.sales_revenue;
+    INSERT INTO inventory_rollups (business_unit, grain, period, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+    VALUES (
+        OLD.business_unit, 'month', substr(OLD.date, 1, 7),
+        -CASE WHEN OLD.transaction_type = 'Purchase' THEN OLD.quantity_kg ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Sale' THEN OLD.quantity_kg ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Purchase' THEN OLD.total_amount ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Sale' THEN OLD.total_amount ELSE 0 END
+    )
+    ON CONFLICT (business_unit, grain, period) DO UPDATE SET
+        purchased_kg = purchased_kg + excluded.purchased_kg,
+        sold_kg = sold_kg + excluded.sold_kg,
+        purchase_cost = purchase_cost + excluded.purchase_cost,
+        sales_revenue = sales_revenue + excluded.sales_revenue;
+END;
+CREATE TRIGGER IF NOT EXISTS inventory_rollups_on_update
+AFTER UPDATE ON inventory
+BEGIN
+    INSERT INTO inventory_rollups (business_unit, grain, period, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+    VALUES (
+        OLD.business_unit, 'day', substr(OLD.date, 1, 10),
+        -CASE WHEN OLD.transaction_type = 'Purchase' THEN OLD.quantity_kg ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Sale' THEN OLD.quantity_kg ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Purchase' THEN OLD.total_amount ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Sale' THEN OLD.total_amount ELSE 0 END
+    )
+    ON CONFLICT (business_unit, grain, period) DO UPDATE SET
+        purchased_kg = purchased_kg + excluded.purchased_kg,
+        sold_kg = sold_kg + excluded.sold_kg,
+        purchase_cost = purchase_cost + excluded.purchase_cost,
+        sales_revenue = sales_revenue + excluded.sales_revenue;
+    INSERT INTO inventory_rollups (business_unit, grain, period, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+    VALUES (
+        OLD.business_unit, 'month', substr(OLD.date, 1, 7),
+        -CASE WHEN OLD.transaction_type = 'Purchase' THEN OLD.quantity_kg ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Sale' THEN OLD.quantity_kg ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Purchase' THEN OLD.total_amount ELSE 0 END,
+        -CASE WHEN OLD.transaction_type = 'Sale' THEN OLD.total_amount ELSE 0 END
+    )
+    ON CONFLICT (business_unit, grain, period) DO UPDATE SET
+        purchased_kg = purchased_kg + excluded.purchased_kg,
+        sold_kg = sold_kg + excluded.sold_kg,
+        purchase_cost = purchase_cost + excluded.purchase_cost,
+        sales_revenue = sales_revenue + excluded.sales_revenue;
+    INSERT INTO inventory_rollups (business_unit, grain, period, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+    VALUES (
+        NEW.business_unit, 'day', substr(NEW.date, 1, 10),
+        CASE WHEN NEW.transaction_type = 'Purchase' THEN NEW.quantity_kg ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Sale' THEN NEW.quantity_kg ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Purchase' THEN NEW.total_amount ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Sale' THEN NEW.total_amount ELSE 0 END
+    )
+    ON CONFLICT (business_unit, grain, period) DO UPDATE SET
+        purchased_kg = purchased_kg + excluded.purchased_kg,
+        sold_kg = sold_kg + excluded.sold_kg,
+        purchase_cost = purchase_cost + excluded.purchase_cost,
+        sales_revenue = sales_revenue + excluded.sales_revenue;
+    INSERT INTO inventory_rollups (business_unit, grain, period, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+    VALUES (
+        NEW.business_unit, 'month', substr(NEW.date, 1, 7),
+        CASE WHEN NEW.transaction_type = 'Purchase' THEN NEW.quantity_kg ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Sale' THEN NEW.quantity_kg ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Purchase' THEN NEW.total_amount ELSE 0 END,
+        CASE WHEN NEW.transaction_type = 'Sale' THEN NEW.total_amount ELSE 0 END
+    )
+    ON CONFLICT (business_unit, grain, period) DO UPDATE SET
+        purchased_kg = purchased_kg + excluded.purchased_kg,
+        sold_kg = sold_kg + excluded.sold_kg,
+        purchase_cost = purchase_cost + excluded.purchase_cost,
+        sales_revenue = sales_revenue + excluded.sales_revenue;
+END;
+
+-- End-of-day stock and valuation per unit, written by data/snapshots.py on
+-- days with inventory activity. lots holds the open FIFO lots as JSON
+-- [[kg, unit_cost], ...]; last_id and row_count detect back-dated writes.
+CREATE TABLE IF NOT EXISTS stock_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    business_unit TEXT NOT NULL,
+    as_of TEXT NOT NULL,
+    stock_kg REAL NOT NULL DEFAULT 0,
+    fifo_value REAL NOT NULL DEFAULT 0,
+    wavg_value REAL NOT NULL DEFAULT 0,
+    market_price REAL,
+    market_value REAL,
+    lots TEXT NOT NULL DEFAULT '[]',
+    last_id INTEGER NOT NULL DEFAULT 0,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+CREATE UNIQUE INDEX IF NOT EXISTS stock_snapshots_unit_date_idx ON stock_snapshots (business_unit, as_of);
+
+CREATE TABLE IF NOT EXISTS expenses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    category TEXT,
+    amount REAL NOT NULL DEFAULT 0,
+    description TEXT,
+    business_unit TEXT NOT NULL,
+    payment_method TEXT,
+    partner TEXT,
+    idempotency_key TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+CREATE INDEX IF NOT EXISTS expenses_unit_date_idx ON expenses (business_unit, date);
+CREATE UNIQUE INDEX IF NOT EXISTS expenses_idempotency_key_idx ON expenses (idempotency_key);
+
+CREATE TABLE IF NOT EXISTS investments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    business_unit TEXT NOT NULL,
+    inv_date TEXT NOT NULL,
+    amount REAL NOT NULL DEFAULT 0,
+    investor TEXT,
+    description TEXT,
+    idempotency_key TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+CREATE INDEX IF NOT EXISTS investments_unit_idx ON investments (business_unit);
+CREATE UNIQUE INDEX IF NOT EXISTS investments_idempotency_key_idx ON investments (idempotency_key);
+
+CREATE TABLE IF NOT EXISTS partnerships (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    business_unit TEXT NOT NULL,
+    partner_name TEXT NOT NULL,
+    share REAL NOT NULL DEFAULT 0,
+    withdrawn REAL NOT NULL DEFAULT 0,
+    invested REAL NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+CREATE INDEX IF NOT EXISTS partnerships_unit_idx ON partnerships (business_unit);
+
+CREATE TABLE IF NOT EXISTS cash_balances (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    business_unit TEXT NOT NULL UNIQUE,
+    balance REAL NOT NULL DEFAULT 0,
+    last_updated TEXT
+);
+
+CREATE TABLE IF NOT EXISTS cash_transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    business_unit TEXT NOT NULL,
+    amount REAL NOT NULL,
+    action TEXT NOT NULL,
+    description TEXT,
+    timestamp TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    new_balance REAL,
+    idempotency_key TEXT
+);
+CREATE INDEX IF NOT EXISTS cash_transactions_unit_idx ON cash_transactions (business_unit, id);
+CREATE UNIQUE INDEX IF NOT EXISTS cash_transactions_idempotency_key_idx ON cash_transactions (idempotency_key);
+
+-- The ledger is append-only; balances are rebased by cash_checkpoints
+CREATE TRIGGER IF NOT EXISTS cash_transactions_no_update
+BEFORE UPDATE ON cash_transactions
+BEGIN
+    SELECT RAISE(ABORT, 'cash_transactions is append-only');
+END;
+CREATE TRIGGER IF NOT EXISTS cash_transactions_no_delete
+BEFORE DELETE ON cash_transactions
+BEGIN
+    SELECT RAISE(ABORT, 'cash_transactions is append-only');
+END;
+
+CREATE TABLE IF NOT EXISTS cash_checkpoints (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    business_unit TEXT NOT NULL,
+    transaction_id INTEGER NOT NULL DEFAULT 0,
+    balance REAL NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'snapshot',
+    as_of TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+CREATE INDEX IF NOT EXISTS cash_checkpoints_unit_idx ON cash_checkpoints (business_unit, transaction_id);
+
+-- Existing balances become opening checkpoints (once per unit)
+INSERT INTO cash_checkpoints (business_unit, transaction_id, balance, kind)
+SELECT b.business_unit,
+       COALESCE((SELECT MAX(t.id) FROM cash_transactions t WHERE t.business_unit = b.business_unit), 0),
+       b.balance,
+       'opening'
+FROM cash_balances b
+WHERE NOT EXISTS (SELECT 1 FROM cash_checkpoints c WHERE c.business_unit = b.business_unit);
+
+CREATE TABLE IF NOT EXISTS market_prices (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    price REAL NOT NULL,
+    date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS market_prices_date_idx ON market_prices (date);
+
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    password_hash TEXT,
+    full_name TEXT,
+    role TEXT NOT NULL DEFAULT 'user',
+    business_unit TEXT NOT NULL DEFAULT 'All',
+    created_at TEXT,
+    last_login TEXT,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    deleted_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    expires_at TEXT
+);
@@ -0,0 +1,72 @@
+"""
+Stock-checked purchases and sales.
+
+available_stock reads a unit's stock from the trigger-maintained unit_stock
+index through the process-wide read cache. Every inventory write invalidates
+the cache entry, so the value is current and a cache hit costs nothing.
+Forms use it to show and pre-check the stock on hand; a failed read raises
+rather than reporting no stock, and the form leaves the check to the database.
+
+record_inventory writes through the record_inventory database function
+(data/supabase_functions.sql), which locks the unit's stock row, refuses a
+sale larger than the stock and inserts in the same transaction. Concurrent
+clerks cannot oversell even when their pre-checks passed.
+"""
+import logging
+from datetime import date
+from typing import Optional, Tuple
+
+from data.repository import Query, get_repository
+from data.idempotency import retried
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def available_stock(business_unit: str) -> float:
+    """
+    Kg on hand in a unit (purchased - sold), from the cached stock index.
+
+    A unit without purchases has no index row and 0 kg. Read errors are
+    raised, not reported as an empty stock.
+    """
+    query = Query("unit_stock", "purchased_kg, sold_kg").eq("business_unit", business_unit)
+    return sum(float(row["purchased_kg"]) - float(row["sold_kg"]) for row in get_repository().fetch(query))
+
+def record_inventory(transaction_type: str, business_unit: str, date_transaction: date, quantity_kg: float,
+                     unit_price: float, remarks: Optional[str] = None,
+                     idempotency_key: Optional[str] = None) -> Tuple[bool, float]:
+    """
+    Record a purchase or sale, refusing sales larger than the stock on hand.
+
+    Args:
+        transaction_type (str): 'Purchase' or 'Sale'
+        business_unit (str): Target business unit
+        date_transaction (date): Transaction date
+        quantity_kg (float): Positive quantity
+        unit_price (float): Positive price per kg
+        remarks (str): Supplier or customer
+        idempotency_key (str): Submission key; a transaction already recorded
+            under it is not recorded again
+
+    Returns:
+        tuple: (applied: bool, available: float) - applied is False when a sale
+        exceeds the stock, which is then returned unchanged
+
+    Raises:
+        ValueError: If quantity or price is not positive or the type is unknown
+    """
+    rows = retried(lambda: get_repository().rpc("record_inventory", {
+        "p_business_unit": business_unit,
+        "p_transaction_type": transaction_type,
+        "p_date": date_transaction,
+        "p_quantity_kg": float(quantity_kg),
+        "p_unit_price": float(unit_price),
+        "p_remarks": remarks or None,
+        "p_idempotency_key": idempotency_key
+    }), idempotency_key)
+    result = rows[0]
+    available = float(result["available"] or 0.0)
+    if result["applied"]:
+        logger.info(f"{business_unit} {transaction_type.lower()} of {float(quantity_kg):,.3f} kg; {available:,.3f} kg on hand")
+    return bool(result["applied"]), available
@@ -0,0 +1,542 @@
+-- Server-side functions for the hosted Supabase (Postgres) project.
+-- Apply in the Supabase SQL editor; every statement is idempotent.
+-- data/repository.py SQLiteRepository implements the same contracts locally.
+
+CREATE INDEX IF NOT EXISTS inventory_unit_date_idx ON inventory (business_unit, date);
+CREATE INDEX IF NOT EXISTS expenses_unit_date_idx ON expenses (business_unit, date);
+-- Newest-first history pages (keyset on date, id)
+CREATE INDEX IF NOT EXISTS inventory_unit_date_id_idx ON inventory (business_unit, date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS expenses_unit_date_id_idx ON expenses (business_unit, date DESC, id DESC);
+-- Idempotent submissions: every form submission carries a client-generated key
+-- that is stored with the rows it writes. The unique indexes turn a repeated
+-- submission (double click, rerun, reconnect, retried timeout) into a no-op;
+-- NULL keys (older rows, imports) never collide.
+ALTER TABLE inventory ADD COLUMN IF NOT EXISTS idempotency_key text;
+ALTER TABLE expenses ADD COLUMN IF NOT EXISTS idempotency_key text;
+ALTER TABLE investments ADD COLUMN IF NOT EXISTS idempotency_key text;
+CREATE UNIQUE INDEX IF NOT EXISTS inventory_idempotency_key_idx ON inventory (idempotency_key);
+CREATE UNIQUE INDEX IF NOT EXISTS expenses_idempotency_key_idx ON expenses (idempotency_key);
+CREATE UNIQUE INDEX IF NOT EXISTS investments_idempotency_key_idx ON investments (idempotency_key);
+
+-- KPI totals per business unit, optionally limited to one unit and a date range.
+-- Returns one row per unit: stock movements, purchase cost, sales revenue and
+-- operating expenses (partner withdrawals/contributions are not operating costs).
+CREATE OR REPLACE FUNCTION unit_kpis(
+    p_business_unit text DEFAULT NULL,
+    p_start date DEFAULT NULL,
+    p_end date DEFAULT NULL
+)
+RETURNS TABLE (
+    business_unit text,
+    purchased_kg double precision,
+    sold_kg double precision,
+    purchase_cost double precision,
+    sales_revenue double precision,
+    operating_expenses double precision
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH movements AS (
+        SELECT
+            i.business_unit,
+            SUM(CASE WHEN i.transaction_type = 'Purchase' THEN i.quantity_kg ELSE 0 END) AS purchased_kg,
+            SUM(CASE WHEN i.transaction_type = 'Sale' THEN i.quantity_kg ELSE 0 END) AS sold_kg,
+            SUM(CASE WHEN i.transaction_type = 'Purchase' THEN i.total_amount ELSE 0 END) AS purchase_cost,
+            SUM(CASE WHEN i.transaction_type = 'Sale' THEN i.total_amount ELSE 0 END) AS sales_revenue
+        FROM inventory i
+        WHERE (p_business_unit IS NULL OR i.business_unit = p_business_unit)
+          AND (p_start IS NULL OR i.date::date >= p_start)
+          AND (p_end IS NULL OR i.date::date <= p_end)
+        GROUP BY i.business_unit
+    ),
+    costs AS (
+        SELECT
+            e.business_unit,
+            SUM(e.amount) AS operating_expenses
+        FROM expenses e
+        WHERE (p_business_unit IS NULL OR e.business_unit = p_business_unit)
+          AND (p_start IS NULL OR e.date::date >= p_start)
+          AND (p_end IS NULL OR e.date::date <= p_end)
+          AND COALESCE(e.category, '') NOT IN ('Partner Withdrawal', 'Partner Contribution')
+        GROUP BY e.business_unit
+    )
+    SELECT
+        COALESCE(m.business_unit, c.business_unit),
+        COALESCE(m.purchased_kg, 0)::double precision,
+        COALESCE(m.sold_kg, 0)::double precision,
+        COALESCE(m.purchase_cost, 0)::double precision,
+        COALESCE(m.sales_revenue, 0)::double precision,
+        COALESCE(c.operating_expenses, 0)::double precision
+    FROM movements m
+    FULL OUTER JOIN costs c ON c.business_unit = m.business_unit
+    ORDER BY 1;
+$$;
+
+-- ----- Running stock index -----
+-- unit_stock holds all-time stock totals per unit. A row trigger on inventory
+-- adjusts them on every insert, update and delete, so current stock and value
+-- are a primary-key lookup however long the inventory history grows.
+CREATE TABLE IF NOT EXISTS unit_stock (
+    business_unit text PRIMARY KEY,
+    purchased_kg double precision NOT NULL DEFAULT 0,
+    sold_kg double precision NOT NULL DEFAULT 0,
+    purchase_cost double precision NOT NULL DEFAULT 0,
+    sales_revenue double precision NOT NULL DEFAULT 0,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+-- Add one inventory row's movement (negated amounts reverse it) to its unit
+CREATE OR REPLACE FUNCTION unit_stock_add(
+    p_business_unit text,
+    p_transaction_type text,
+    p_quantity_kg double precision,
+    p_total_amount double precision
+)
+RETURNS void
+LANGUAGE sql
+AS $$
+    INSERT INTO unit_stock AS s (business_unit, purchased_kg, sold_kg, purchase_cost, sales_revenue, updated_at)
+    VALUES (
+        p_business_unit,
+        CASE WHEN p_transaction_type = 'Purchase' THEN p_quantity_kg ELSE 0 END,
+        CASE WHEN p_transaction_type = 'Sale' THEN p_quantity_kg ELSE 0 END,
+        CASE WHEN p_transaction_type = 'Purchase' THEN p_total_amount ELSE 0 END,
+        CASE WHEN p_transaction_type = 'Sale' THEN p_total_amount ELSE 0 END,
+        now()
+    )
+    ON CONFLICT (business_unit) DO UPDATE SET
+        purchased_kg = s.purchased_kg + excluded.purchased_kg,
+        sold_kg = s.sold_kg + excluded.sold_kg,
+        purchase_cost = s.purchase_cost + excluded.purchase_cost,
+        sales_revenue = s.sales_revenue + excluded.sales_revenue,
+        updated_at = excluded.updated_at;
+$$;
+
+-- An update reverses the old row and applies the new one
+CREATE OR REPLACE FUNCTION unit_stock_apply()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM unit_stock_add(OLD.business_unit, OLD.transaction_type,
+                               -OLD.quantity_kg::double precision, -OLD.total_amount::double precision);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM unit_stock_add(NEW.business_unit, NEW.transaction_type,
+                               NEW.quantity_kg::double precision, NEW.total_amount::double precision);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+-- Index existing inventory once and install the trigger atomically, so no
+-- write lands between the two
+BEGIN;
+LOCK TABLE inventory IN SHARE ROW EXCLUSIVE MODE;
+INSERT INTO unit_stock (business_unit, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+SELECT i.business_unit,
+       SUM(CASE WHEN i.transaction_type = 'Purchase' THEN i.quantity_kg ELSE 0 END),
+       SUM(CASE WHEN i.transaction_type = 'Sale' THEN i.quantity_kg ELSE 0 END),
+       SUM(CASE WHEN i.transaction_type = 'Purchase' THEN i.total_amount ELSE 0 END),
+       SUM(CASE WHEN i.transaction_type = 'Sale' THEN i.total_amount ELSE 0 END)
+FROM inventory i
+WHERE NOT EXISTS (SELECT 1 FROM unit_stock)
+GROUP BY i.business_unit;
+DROP TRIGGER IF EXISTS unit_stock_maintain ON inventory;
+CREATE TRIGGER unit_stock_maintain
+    AFTER INSERT OR UPDATE OR DELETE ON inventory
+    FOR EACH ROW EXECUTE FUNCTION unit_stock_apply();
+COMMIT;
+
+-- ----- Stock-checked inventory writes -----
+-- Records a purchase or sale in one transaction. The unit's unit_stock row is
+-- locked first and a sale larger than the stock on hand is refused
+-- (applied = false), so concurrent clerks cannot oversell. The unit_stock
+-- trigger applies the insert before the lock is released. A transaction
+-- already recorded under p_idempotency_key is returned instead of repeated.
+DROP FUNCTION IF EXISTS record_inventory(text, text, date, double precision, double precision, text);
+CREATE OR REPLACE FUNCTION record_inventory(
+    p_business_unit text,
+    p_transaction_type text,
+    p_date date,
+    p_quantity_kg double precision,
+    p_unit_price double precision,
+    p_remarks text DEFAULT NULL,
+    p_idempotency_key text DEFAULT NULL
+)
+RETURNS TABLE (applied boolean, available double precision, id bigint)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_available double precision;
+    v_id bigint;
+BEGIN
+    IF p_quantity_kg IS NULL OR p_quantity_kg <= 0 OR p_unit_price IS NULL OR p_unit_price <= 0 THEN
+        RAISE EXCEPTION 'Quantity and price must be positive';
+    END IF;
+    IF p_transaction_type NOT IN ('Purchase', 'Sale') THEN
+        RAISE EXCEPTION 'Invalid transaction type: %', p_transaction_type;
+    END IF;
+
+    INSERT INTO unit_stock (business_unit) VALUES (p_business_unit)
+    ON CONFLICT (business_unit) DO NOTHING;
+    SELECT s.purchased_kg - s.sold_kg INTO v_available
+    FROM unit_stock s WHERE s.business_unit = p_business_unit
+    FOR UPDATE;
+
+    -- Same-key attempts hold the same unit lock, so this lookup cannot race
+    IF p_idempotency_key IS NOT NULL THEN
+        SELECT i.id INTO v_id FROM inventory i WHERE i.idempotency_key = p_idempotency_key;
+        IF FOUND THEN
+            RETURN QUERY SELECT true, v_available, v_id;
+            RETURN;
+        END IF;
+    END IF;
+
+    IF p_transaction_type = 'Sale' AND p_quantity_kg > v_available + 1e-9 THEN
+        RETURN QUERY SELECT false, v_available, NULL::bigint;
+        RETURN;
+    END IF;
+
+    INSERT INTO inventory (date, transaction_type, quantity_kg, unit_price, total_amount, remarks, business_unit,
+                           idempotency_key)
+    VALUES (p_date, p_transaction_type, p_quantity_kg, p_unit_price, p_quantity_kg * p_unit_price,
+            p_remarks, p_business_unit, p_idempotency_key)
+    RETURNING inventory.id INTO v_id;
+
+    RETURN QUERY SELECT true,
+        v_available + CASE WHEN p_transaction_type = 'Purchase' THEN p_quantity_kg ELSE -p_quantity_kg END,
+        v_id;
+END;
+$$;
+
+-- ----- Inventory rollups -----
+-- inventory_rollups holds purchase and sale totals per unit and day (grain
+-- 'day', period YYYY-MM-DD) and month (grain 'month', period YYYY-MM). A row
+-- trigger on inventory keeps both grains current, so movement charts read a
+-- row per period instead of every transaction.
+CREATE TABLE IF NOT EXISTS inventory_rollups (
+    business_unit text NOT NULL,
+    grain text NOT NULL,
+    period text NOT NULL,
+    purchased_kg double precision NOT NULL DEFAULT 0,
+    sold_kg double precision NOT NULL DEFAULT 0,
+    purchase_cost double precision NOT NULL DEFAULT 0,
+    sales_revenue double precision NOT NULL DEFAULT 0,
+    PRIMARY KEY (business_unit, grain, period)
+);
+
+-- Add one inventory row's movement (negated amounts reverse it) to its day and month
+CREATE OR REPLACE FUNCTION inventory_rollup_add(
+    p_business_unit text,
+    p_transaction_type text,
+    p_date date,
+    p_quantity_kg double precision,
+    p_total_amount double precision
+)
+RETURNS void
+LANGUAGE sql
+AS $$
+    INSERT INTO inventory_rollups AS r (business_unit, grain, period, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+    SELECT
+        p_business_unit, g.grain, to_char(p_date, g.format),
+        CASE WHEN p_transaction_type = 'Purchase' THEN p_quantity_kg ELSE 0 END,
+        CASE WHEN p_transaction_type = 'Sale' THEN p_quantity_kg ELSE 0 END,
+        CASE WHEN p_transaction_type = 'Purchase' THEN p_total_amount ELSE 0 END,
+        CASE WHEN p_transaction_type = 'Sale' THEN p_total_amount ELSE 0 END
+    FROM (VALUES ('day', 'YYYY-MM-DD'), ('month', 'YYYY-MM')) AS g (grain, format)
+    ON CONFLICT (business_unit, grain, period) DO UPDATE SET
+        purchased_kg = r.purchased_kg + excluded.purchased_kg,
+        sold_kg = r.sold_kg + excluded.sold_kg,
+        purchase_cost = r.purchase_cost + excluded.purchase_cost,
+        sales_revenue = r.sales_revenue + excluded.sales_revenue;
+$$;
+
+CREATE OR REPLACE FUNCTION inventory_rollups_apply()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM inventory_rollup_add(OLD.business_unit, OLD.transaction_type, OLD.date::date,
+                                     -OLD.quantity_kg::double precision, -OLD.total_amount::double precision);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM inventory_rollup_add(NEW.business_unit, NEW.transaction_type, NEW.date::date,
+                                     NEW.quantity_kg::double precision, NEW.total_amount::double precision);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+BEGIN;
+LOCK TABLE inventory IN SHARE ROW EXCLUSIVE MODE;
+INSERT INTO inventory_rollups (business_unit, grain, period, purchased_kg, sold_kg, purchase_cost, sales_revenue)
+SELECT i.business_unit, g.grain, to_char(i.date::date, g.format),
+       SUM(CASE WHEN i.transaction_type = 'Purchase' THEN i.quantity_kg ELSE 0 END),
+       SUM(CASE WHEN i.transaction_type = 'Sale' THEN i.quantity_kg ELSE 0 END),
+       SUM(CASE WHEN i.transaction_type = 'Purchase' THEN i.total_amount ELSE 0 END),
+       SUM(CASE WHEN i.transaction_type = 'Sale' THEN i.total_amount ELSE 0 END)
+FROM inventory i
+CROSS JOIN (VALUES ('day', 'YYYY-MM-DD'), ('month', 'YYYY-MM')) AS g (grain, format)
+WHERE NOT EXISTS (SELECT 1 FROM inventory_rollups)
+GROUP BY i.business_unit, g.grain, to_char(i.date::date, g.format);
+DROP TRIGGER IF EXISTS inventory_rollups_maintain ON inventory;
+CREATE TRIGGER inventory_rollups_maintain
+    AFTER INSERT OR UPDATE OR DELETE ON inventory
+    FOR EACH ROW EXECUTE FUNCTION inventory_rollups_apply();
+COMMIT;
+
+-- ----- Stock snapshots -----
+-- End-of-day stock and valuation per unit, written by data/snapshots.py
+-- (python -m data.snapshots, e.g. from a nightly cron) on days with inventory
+-- activity. lots holds the open FIFO lots as [[kg, unit_cost], ...]; last_id
+-- and row_count let readers detect back-dated writes after a snapshot.
+CREATE TABLE IF NOT EXISTS stock_snapshots (
+    id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    business_unit text NOT NULL,
+    as_of date NOT NULL,
+    stock_kg double precision NOT NULL DEFAULT 0,
+    fifo_value double precision NOT NULL DEFAULT 0,
+    wavg_value double precision NOT NULL DEFAULT 0,
+    market_price double precision,
+    market_value double precision,
+    lots jsonb NOT NULL DEFAULT '[]'::jsonb,
+    last_id bigint NOT NULL DEFAULT 0,
+    row_count bigint NOT NULL DEFAULT 0,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+CREATE UNIQUE INDEX IF NOT EXISTS stock_snapshots_unit_date_idx ON stock_snapshots (business_unit, as_of);
+
+-- ----- Cash ledger -----
+-- cash_transactions is the append-only source of truth for cash. Balances are
+-- checkpointed in cash_checkpoints: the balance after transaction N is the
+-- latest checkpoint at or before N plus the sum of the later movements. An
+-- 'opening' checkpoint sets a balance outright (first use, data reset); a
+-- 'snapshot' checkpoint is written every 500 movements so no read has to sum
+-- a long tail. cash_balances keeps the current value per unit and is the row
+-- locked by movements; only the functions below write it.
+ALTER TABLE cash_balances ADD COLUMN IF NOT EXISTS last_updated timestamptz;
+
+CREATE TABLE IF NOT EXISTS cash_transactions (
+    id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    business_unit text NOT NULL,
+    amount double precision NOT NULL,
+    action text NOT NULL,
+    description text,
+    timestamp timestamptz NOT NULL DEFAULT now(),
+    new_balance double precision
+);
+CREATE INDEX IF NOT EXISTS cash_transactions_unit_idx ON cash_transactions (business_unit, id);
+ALTER TABLE cash_transactions ADD COLUMN IF NOT EXISTS idempotency_key text;
+CREATE UNIQUE INDEX IF NOT EXISTS cash_transactions_idempotency_key_idx ON cash_transactions (idempotency_key);
+
+CREATE TABLE IF NOT EXISTS cash_checkpoints (
+    id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    business_unit text NOT NULL,
+    transaction_id bigint NOT NULL DEFAULT 0,
+    balance double precision NOT NULL,
+    kind text NOT NULL DEFAULT 'snapshot',
+    as_of timestamptz NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS cash_checkpoints_unit_idx ON cash_checkpoints (business_unit, transaction_id);
+
+CREATE OR REPLACE FUNCTION cash_transactions_append_only()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RAISE EXCEPTION 'cash_transactions is append-only';
+END;
+$$;
+
+DROP TRIGGER IF EXISTS cash_transactions_append_only ON cash_transactions;
+CREATE TRIGGER cash_transactions_append_only
+    BEFORE UPDATE OR DELETE ON cash_transactions
+    FOR EACH ROW EXECUTE FUNCTION cash_transactions_append_only();
+
+-- Existing balances become opening checkpoints (runs once per unit)
+INSERT INTO cash_checkpoints (business_unit, transaction_id, balance, kind)
+SELECT b.business_unit,
+       COALESCE((SELECT MAX(t.id) FROM cash_transactions t WHERE t.business_unit = b.business_unit), 0),
+       b.balance,
+       'opening'
+FROM cash_balances b
+WHERE NOT EXISTS (SELECT 1 FROM cash_checkpoints c WHERE c.business_unit = b.business_unit);
+
+-- Set a unit's balance outright (initial balance or reset)
+CREATE OR REPLACE FUNCTION open_cash_balance(
+    p_business_unit text,
+    p_balance double precision
+)
+RETURNS TABLE (applied boolean, balance double precision)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+BEGIN
+    INSERT INTO cash_balances (business_unit, balance, last_updated)
+    VALUES (p_business_unit, p_balance, now())
+    ON CONFLICT (business_unit) DO UPDATE SET balance = excluded.balance, last_updated = excluded.last_updated;
+
+    INSERT INTO cash_checkpoints (business_unit, transaction_id, balance, kind)
+    SELECT p_business_unit, COALESCE(MAX(t.id), 0), p_balance, 'opening'
+    FROM cash_transactions t
+    WHERE t.business_unit = p_business_unit;
+
+    RETURN QUERY SELECT true, p_balance;
+END;
+$$;
+
+-- Atomic cash movement: one round trip per deposit/withdrawal.
+-- The conditional UPDATE takes the row lock, so concurrent movements on the
+-- same unit serialise and none are lost; a withdrawal larger than the balance
+-- changes nothing and returns applied = false. The ledger entry (and, every
+-- 500 movements, a snapshot checkpoint) is written in the same transaction.
+-- A movement already recorded under p_idempotency_key is not repeated; its
+-- resulting balance is returned.
+DROP FUNCTION IF EXISTS adjust_cash_balance(text, double precision, text, text);
+CREATE OR REPLACE FUNCTION adjust_cash_balance(
+    p_business_unit text,
+    p_amount double precision,
+    p_action text,
+    p_description text DEFAULT NULL,
+    p_idempotency_key text DEFAULT NULL
+)
+RETURNS TABLE (applied boolean, balance double precision)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_balance double precision;
+    v_transaction_id bigint;
+    v_checkpoint_id bigint;
+BEGIN
+    IF p_amount IS NULL OR p_amount <= 0 THEN
+        RAISE EXCEPTION 'Amount must be positive';
+    END IF;
+    IF p_action NOT IN ('add', 'subtract') THEN
+        RAISE EXCEPTION 'Invalid action: %', p_action;
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM cash_balances c WHERE c.business_unit = p_business_unit) THEN
+        PERFORM open_cash_balance(p_business_unit, 0);
+    END IF;
+
+    IF p_idempotency_key IS NOT NULL THEN
+        -- Lock the balance first so a concurrent attempt with the same key waits and then finds it
+        PERFORM 1 FROM cash_balances c WHERE c.business_unit = p_business_unit FOR UPDATE;
+        SELECT t.new_balance INTO v_balance FROM cash_transactions t WHERE t.idempotency_key = p_idempotency_key;
+        IF FOUND THEN
+            RETURN QUERY SELECT true, v_balance;
+            RETURN;
+        END IF;
+    END IF;
+
+    UPDATE cash_balances c
+    SET balance = c.balance + CASE WHEN p_action = 'add' THEN p_amount ELSE -p_amount END,
+        last_updated = now()
+    WHERE c.business_unit = p_business_unit
+      AND (p_action = 'add' OR c.balance >= p_amount)
+    RETURNING c.balance INTO v_balance;
+
+    IF NOT FOUND THEN
+        SELECT c.balance INTO v_balance FROM cash_balances c WHERE c.business_unit = p_business_unit;
+        RETURN QUERY SELECT false, v_balance;
+        RETURN;
+    END IF;
+
+    INSERT INTO cash_transactions (business_unit, amount, action, description, new_balance, idempotency_key)
+    VALUES (p_business_unit, p_amount, p_action, p_description, v_balance, p_idempotency_key)
+    RETURNING id INTO v_transaction_id;
+
+    SELECT COALESCE(MAX(k.transaction_id), 0) INTO v_checkpoint_id
+    FROM cash_checkpoints k WHERE k.business_unit = p_business_unit;
+    IF (SELECT COUNT(*) FROM cash_transactions t
+        WHERE t.business_unit = p_business_unit AND t.id > v_checkpoint_id) >= 500 THEN
+        INSERT INTO cash_checkpoints (business_unit, transaction_id, balance, kind)
+        VALUES (p_business_unit, v_transaction_id, v_balance, 'snapshot');
+    END IF;
+
+    RETURN QUERY SELECT true, v_balance;
+END;
+$$;
+
+-- Balance of a unit as of a point in time (now when p_at is null):
+-- latest checkpoint at or before p_at plus the movements after it.
+CREATE OR REPLACE FUNCTION cash_balance_at(
+    p_business_unit text,
+    p_at timestamptz DEFAULT NULL
+)
+RETURNS TABLE (balance double precision)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH checkpoint AS (
+        SELECT k.transaction_id, k.balance
+        FROM cash_checkpoints k
+        WHERE k.business_unit = p_business_unit
+          AND (p_at IS NULL OR k.as_of <= p_at)
+        ORDER BY k.transaction_id DESC, k.id DESC
+        LIMIT 1
+    )
+    SELECT (
+        COALESCE((SELECT c.balance FROM checkpoint c), 0)
+        + COALESCE((
+            SELECT SUM(CASE WHEN t.action = 'subtract' THEN -t.amount ELSE t.amount END)
+            FROM cash_transactions t
+            WHERE t.business_unit = p_business_unit
+              AND t.id > COALESCE((SELECT c.transaction_id FROM checkpoint c), 0)
+              AND (p_at IS NULL OR t.timestamp <= p_at)
+        ), 0)
+    )::double precision;
+$$;
+
+-- ----- Dashboard snapshot -----
+-- Everything the dashboard shows, in one round trip: per unit the cash
+-- balance, all-time stock totals (from the unit_stock index) and
+-- operating expenses, plus the latest p_price_history market prices, newest
+-- first. Units are those with a balance, stock or operating expenses.
+CREATE OR REPLACE FUNCTION dashboard_snapshot(p_price_history integer DEFAULT 30)
+RETURNS TABLE (payload jsonb)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH costs AS (
+        SELECT e.business_unit, SUM(e.amount) AS operating_expenses
+        FROM expenses e
+        WHERE COALESCE(e.category, '') NOT IN ('Partner Withdrawal', 'Partner Contribution')
+        GROUP BY e.business_unit
+    ),
+    units AS (
+        SELECT b.business_unit FROM cash_balances b
+        UNION SELECT s.business_unit FROM unit_stock s
+        UNION SELECT c.business_unit FROM costs c
+    ),
+    prices AS (
+        SELECT p.price, p.date FROM market_prices p ORDER BY p.date DESC LIMIT p_price_history
+    )
+    SELECT jsonb_build_object(
+        'units', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'business_unit', u.business_unit,
+                'cash_balance', COALESCE(b.balance, 0),
+                'purchased_kg', COALESCE(s.purchased_kg, 0),
+                'sold_kg', COALESCE(s.sold_kg, 0),
+                'purchase_cost', COALESCE(s.purchase_cost, 0),
+                'sales_revenue', COALESCE(s.sales_revenue, 0),
+                'operating_expenses', COALESCE(c.operating_expenses, 0)
+            ) ORDER BY u.business_unit)
+            FROM units u
+            LEFT JOIN cash_balances b ON b.business_unit = u.business_unit
+            LEFT JOIN unit_stock s ON s.business_unit = u.business_unit
+            LEFT JOIN costs c ON c.business_unit = u.business_unit
+        ), '[]'::jsonb),
+        'prices', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('price', p.price, 'date', p.date) ORDER BY p.date DESC)
+            FROM prices p
+        ), '[]'::jsonb)
+    );
+$$;
@@ -0,0 +1,99 @@
+"""
+On-disk columnar snapshots of the large session tables for warm starts.
+
+Each table is stored as an Arrow IPC file under WARM_CACHE_DIR together with
+the high-water mark (largest id) it holds, the projection columns and the
+time it was written. A freshly started process reads the file into a
+DataFrame instead of downloading the table, then fetches only the rows
+above the mark (see data/shared_tables.SharedTables). Files are replaced
+atomically, so concurrent sessions and workers never read a half-written
+snapshot.
+
+WARM_CACHE_DIR defaults to .bizmaster_cache in the project directory; set
+BIZMASTER_WARM_CACHE_DIR to an empty string to disable the cache.
+"""
+import os
+import json
+import time
+import logging
+import tempfile
+from typing import Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+from data.projections import column_list
+from data.schema import coerce
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WARM_CACHE_DIR = os.getenv(
+    "BIZMASTER_WARM_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".bizmaster_cache")
+)
+# Snapshots older than this are ignored and rebuilt by a full load
+WARM_CACHE_MAX_AGE = float(os.getenv("BIZMASTER_WARM_CACHE_HOURS", "24")) * 3600
+
+METADATA_KEY = b"bizmaster"
+
+def _path(table: str) -> str:
+    return os.path.join(WARM_CACHE_DIR, f"{table}.arrow")
+
+def save(table: str, frame: pd.DataFrame, view: type, mark: int) -> None:
+    """Write a table snapshot holding every row up to id mark; failures are logged, never raised"""
+    if not WARM_CACHE_DIR:
+        return
+    try:
+        os.makedirs(WARM_CACHE_DIR, exist_ok=True)
+        arrow = pa.Table.from_pandas(frame[column_list(view)], preserve_index=False)
+        metadata = dict(arrow.schema.metadata or {})
+        metadata[METADATA_KEY] = json.dumps({
+            "mark": int(mark), "columns": column_list(view), "written": time.time()
+        }).encode()
+        arrow = arrow.replace_schema_metadata(metadata)
+
+        descriptor, temporary = tempfile.mkstemp(dir=WARM_CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as sink, pa.ipc.new_file(sink, arrow.schema) as writer:
+                writer.write_table(arrow)
+            os.replace(temporary, _path(table))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+    except Exception as e:
+        logger.warning(f"Could not write warm cache for {table}: {str(e)}")
+
+def load(table: str, view: type) -> Optional[Tuple[pd.DataFrame, int]]:
+    """
+    Read a table snapshot.
+
+    Returns:
+        tuple: (frame, mark) or None when there is no usable snapshot (missing,
+        unreadable, too old, or written for different projection columns)
+    """
+    if not WARM_CACHE_DIR:
+        return None
+    try:
+        # The map only spares a read buffer: to_pandas copies the columns out of it
+        with pa.memory_map(_path(table), "r") as source:
+            arrow = pa.ipc.open_file(source).read_all()
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable warm cache for {table}: {str(e)}")
+        return None
+
+    info = json.loads((arrow.schema.metadata or {}).get(METADATA_KEY, b"{}"))
+    if info.get("columns") != column_list(view) or time.time() - info.get("written", 0) > WARM_CACHE_MAX_AGE:
+        return None
+    return coerce(arrow.to_pandas(), table), int(info["mark"])
+
+def clear() -> None:
+    """Drop every snapshot, e.g. after the tables were reset"""
+    if not WARM_CACHE_DIR or not os.path.isdir(WARM_CACHE_DIR):
+        return
+    for name in os.listdir(WARM_CACHE_DIR):
+        if name.endswith(".arrow"):
+            os.unlink(os.path.join(WARM_CACHE_DIR, name))